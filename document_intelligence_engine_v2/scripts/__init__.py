@@ -6,13 +6,20 @@ A lightweight but high-quality retrieval layer for document intelligence systems
 __version__ = "1.0.0"
 __author__ = "Document Intelligence Team"
 
+import importlib
+
 from .config import *
-from .document_loader import DocumentLoader
-from .chunking_engine import ChunkingEngine
-from .embedding_engine import EmbeddingEngine
-from .vector_store_manager import VectorStoreManager
-from .retriever import Retriever
-from .context_builder import ContextBuilder
+
+# Engines are imported on first attribute access (PEP 562), so importing
+# the package does not pull in torch, faiss or the document parsers
+_LAZY_ATTRS = {
+    "DocumentLoader": "document_loader",
+    "ChunkingEngine": "chunking_engine",
+    "EmbeddingEngine": "embedding_engine",
+    "VectorStoreManager": "vector_store_manager",
+    "Retriever": "retriever",
+    "ContextBuilder": "context_builder",
+}
 
 __all__ = [
     "DocumentLoader",
@@ -22,3 +29,12 @@ __all__ = [
     "Retriever",
     "ContextBuilder",
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(f".{_LAZY_ATTRS[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,9 +8,12 @@ import os
 import sys
 import logging
 import shutil
+import tarfile
+import zipfile
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
+import numpy as np
 from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent.parent / ".env")
 
@@ -57,6 +60,14 @@ class IngestResponse(BaseModel):
     message: str
     documents_loaded: int
     chunks_created: int
+    quarantined: List[Dict[str, str]] = []
+    failed: List[Dict[str, str]] = []
+    boilerplate_chars_removed: int = 0
+    boilerplate_chunks_saved: int = 0
+    pdf_pages_by_backend: Dict[str, int] = {}
+    low_information_chunks: int = 0
+    duplicate_chunks_folded: int = 0
+    embeddings_reused: int = 0
 
 class StatusResponse(BaseModel):
     status: str
@@ -76,34 +87,56 @@ def get_engines():
 
     _engines.clear()
     from document_loader import DocumentLoader
+    from extraction_cache import ExtractionCache
     from chunking_engine import ChunkingEngine
     from embedding_engine import EmbeddingEngine
     from vector_store_manager import VectorStoreManager
     from retriever import Retriever
     from context_builder import ContextBuilder
     from generation_engine import GenerationEngine
+    from token_counter import load_token_counter
 
     logger.info("Initialising DocIntel engines...")
 
-    loader   = DocumentLoader()
-    chunker  = ChunkingEngine()
-    embedder = EmbeddingEngine()
+    cache    = ExtractionCache(config.EXTRACTION_CACHE_DIR) if config.USE_EXTRACTION_CACHE else None
+    loader   = DocumentLoader(
+        workers=config.INGEST_WORKERS,
+        cache=cache,
+        options=config.EXTRACT_OPTIONS,
+        timeout=config.EXTRACT_TIMEOUT,
+        max_rss_mb=config.EXTRACT_MAX_RSS_MB,
+        strip_boilerplate=config.STRIP_BOILERPLATE,
+        include=config.SCAN_INCLUDE,
+        exclude=config.SCAN_EXCLUDE,
+        max_depth=config.SCAN_MAX_DEPTH,
+    )
+    counter  = None
+    if config.CHUNK_SIZING == "tokenizer":
+        counter = load_token_counter(config.EMBEDDING_MODEL, config.EMBEDDING_MAX_TOKENS)
+    embedder = EmbeddingEngine(model_name=config.EMBEDDING_MODEL)
+    chunker  = ChunkingEngine(
+        token_counter=counter,
+        sentence_embedder=embedder if config.CHUNKING_MODE == "semantic" else None,
+        semantic_threshold=config.SEMANTIC_THRESHOLD,
+        levels=config.INDEX_LEVELS,
+    )
 
     embedding_dim = embedder.model.get_sentence_embedding_dimension()
     logger.info(f"Embedding dimension: {embedding_dim}")
 
+    config.ensure_directories()
     vector_store_dir = Path(config.VECTOR_STORE_DIR)
-    vector_store_dir.mkdir(parents=True, exist_ok=True)
 
     vsm = VectorStoreManager(
         embedding_dim=embedding_dim,
         index_type="cosine",
         index_path=vector_store_dir / "index.faiss",
         metadata_path=vector_store_dir / "metadata.json",
+        embedding_model=config.EMBEDDING_MODEL,
     )
 
     retriever = Retriever(vsm, embedder)
-    builder   = ContextBuilder()
+    builder   = ContextBuilder(token_counter=counter)
 
     api_key = os.environ.get("GROQ_API_KEY")
     if not api_key:
@@ -162,26 +195,69 @@ def ingest():
         raise HTTPException(status_code=400, detail="Data directory is empty.")
 
     documents = engines["loader"].load_directory(str(data_dir))
+    report = engines["loader"].last_report
     if not documents:
-        raise HTTPException(status_code=400, detail="No documents could be loaded.")
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "No documents could be loaded.",
+                "quarantined": report["quarantined"],
+                "failed": report["failed"],
+            },
+        )
 
     all_chunks = []
     for doc in documents:
         chunks = engines["chunker"].chunk_document(doc)
         all_chunks.extend(chunks)
 
-    embeddings = engines["embedder"].embed_chunks(all_chunks)
+    chunks_created = sum(1 for c in all_chunks if c.get("level", "chunk") == "chunk")
+    noise = 0
+    if config.NOISE_FILTER != "off":
+        from chunk_filter import ChunkFilter
+        chunk_filter = ChunkFilter(min_score=config.NOISE_MIN_SCORE, mode=config.NOISE_FILTER,
+                                   weight=config.NOISE_WEIGHT)
+        all_chunks = chunk_filter.apply(all_chunks)
+        noise = chunk_filter.last_stats["noise"]
+
+    duplicates = 0
+    if config.DEDUP_CHUNKS:
+        from chunk_deduplicator import ChunkDeduplicator
+        deduplicator = ChunkDeduplicator(threshold=config.DEDUP_THRESHOLD)
+        all_chunks = deduplicator.deduplicate(all_chunks)
+        duplicates = deduplicator.last_stats["duplicates"]
+
+    # Unchanged chunks (same chunk_id) keep their stored vectors
+    stored = engines["vsm"].get_embeddings(
+        [c["chunk_id"] for c in all_chunks if c.get("embedding") is None]
+    )
+    for chunk in all_chunks:
+        if chunk["chunk_id"] in stored and chunk.get("embedding") is None:
+            chunk["embedding"] = stored[chunk["chunk_id"]]
+
+    all_chunks = engines["embedder"].embed_chunks(all_chunks)
+    embeddings = np.array([c.pop("embedding") for c in all_chunks], dtype=np.float32)
 
     engines["vsm"].reset()
     engines["vsm"].add_embeddings(embeddings, all_chunks)
     engines["vsm"].save()
 
-    logger.info(f"Ingested {len(documents)} documents, {len(all_chunks)} chunks")
+    logger.info(f"Ingested {len(documents)} documents, {chunks_created} chunks "
+                f"({noise} low-information, {duplicates} near-duplicates folded, "
+                f"{len(stored)} embeddings reused)")
 
     return IngestResponse(
         message="Ingest complete.",
         documents_loaded=len(documents),
-        chunks_created=len(all_chunks),
+        chunks_created=chunks_created,
+        quarantined=report["quarantined"],
+        failed=report["failed"],
+        boilerplate_chars_removed=report["boilerplate_chars"],
+        boilerplate_chunks_saved=engines["chunker"].estimate_chunk_count(report["boilerplate_chars"]),
+        pdf_pages_by_backend=report["backends"],
+        low_information_chunks=noise,
+        duplicate_chunks_folded=duplicates,
+        embeddings_reused=len(stored),
     )
 
 
@@ -195,12 +271,26 @@ async def upload_document(file: UploadFile = File(...)):
     with open(dest, "wb") as f:
         shutil.copyfileobj(file.file, f)
 
-    return {
+    response = {
         "message": f"Uploaded '{file.filename}'. Call /ingest to process it.",
         "filename": file.filename,
         "size_bytes": dest.stat().st_size,
     }
 
+    # Archives are stored as-is; /ingest streams their members into the
+    # extractors. Reject unreadable ones now rather than at ingest time.
+    from document_loader import ARCHIVE_SUFFIXES, count_archive_members
+    if dest.name.lower().endswith(ARCHIVE_SUFFIXES):
+        try:
+            members = count_archive_members(dest)
+        except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) as e:
+            dest.unlink()
+            raise HTTPException(status_code=400, detail=f"Unreadable archive: {e}")
+        if members is not None:  # only zips are counted cheaply
+            response["archive_members"] = members
+
+    return response
+
 
 @app.post("/query", response_model=QueryResponse)
 def query(request: QueryRequest):
@@ -240,9 +330,8 @@ def query(request: QueryRequest):
 
     top_chunk = context_chunks[0]
     source_info = top_chunk.get("doc_id", "")
-    meta = top_chunk.get("metadata", {})
-    section = meta.get("section")
-    page = meta.get("page")
+    section = top_chunk.get("section")
+    page = top_chunk.get("page")
     if section or page:
         source_info += f" | Section: {section} | Page: {page}"
 
@@ -0,0 +1,127 @@
+"""
+Append tracking for incremental ingest.
+Remembers, per source file, how many bytes were ingested and a fingerprint
+of that prefix, so files that only grow (CSV exports, logs) can be
+refreshed by extracting just the new tail.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BYTES = 64 * 1024  # bytes hashed from each end of the ingested prefix
+
+
+def prefix_fingerprint(file_path: Path, length: int) -> str:
+    """
+    Fingerprint the first `length` bytes of a file.
+
+    Hashes the prefix length plus its first and last FINGERPRINT_BYTES,
+    so checking a multi-GB log costs two small reads rather than a full
+    re-read. This catches rotation, truncation and rewrites; an edit in
+    the middle of an append-only file is not detected.
+    """
+    digest = hashlib.sha256(str(length).encode())
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(min(length, FINGERPRINT_BYTES)))
+        if length > FINGERPRINT_BYTES:
+            f.seek(max(FINGERPRINT_BYTES, length - FINGERPRINT_BYTES))
+            digest.update(f.read(length - f.tell()))
+    return digest.hexdigest()
+
+
+class AppendState:
+    """
+    JSON file mapping each ingested file path to what was ingested from it:
+
+        {"offset": bytes ingested, "fingerprint": prefix fingerprint,
+         "doc_id": str | None, "next_chunk": int, "next_page": int,
+         "next_row": int, "header": str}   # last three only for CSV/text
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: State file (created on save)
+        """
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable append state {self.path.name}: {e}")
+
+    def check(self, file_path: Path) -> Tuple[str, Optional[Dict]]:
+        """
+        Compare a file with what was ingested from it.
+
+        Returns:
+            (status, entry) where status is "new", "unchanged", "appended"
+            (prefix intact, file longer) or "rewritten" (prefix changed or
+            file shorter)
+        """
+        entry = self.entries.get(str(file_path))
+        if entry is None:
+            return "new", None
+        size = file_path.stat().st_size
+        if size < entry["offset"]:
+            return "rewritten", entry
+        if prefix_fingerprint(file_path, entry["offset"]) != entry["fingerprint"]:
+            return "rewritten", entry
+        return ("appended" if size > entry["offset"] else "unchanged"), entry
+
+    def record(self, file_path: Path, offset: int, doc: Optional[Dict] = None,
+               chunk_count: int = 0) -> None:
+        """
+        Remember that the first `offset` bytes of a file have been ingested.
+
+        Args:
+            file_path: Source file
+            offset: Bytes ingested
+            doc: Document built from those bytes (None if it yielded nothing);
+                 a CSV's header comes from metadata["table_header"]
+            chunk_count: Chunks created for doc so far
+        """
+        entry = {
+            "offset": offset,
+            "fingerprint": prefix_fingerprint(file_path, offset),
+            "doc_id": doc["doc_id"] if doc else None,
+            "next_chunk": chunk_count,
+        }
+        if doc and doc["pages"]:
+            last = doc["pages"][-1]
+            entry["next_page"] = last["page"] + 1
+            if last.get("rows"):
+                entry["next_row"] = last["rows"][1] + 1
+                entry["header"] = doc["metadata"].get("table_header")
+        self.entries[str(file_path)] = entry
+
+    def extend(self, file_path: Path, tail_doc: Dict, chunk_count: int) -> None:
+        """Advance an entry past a tail loaded with DocumentLoader.load_tail."""
+        entry = self.entries[str(file_path)]
+        entry["offset"] = tail_doc["metadata"]["tail"][1]
+        entry["fingerprint"] = prefix_fingerprint(file_path, entry["offset"])
+        entry["next_chunk"] += chunk_count
+        if tail_doc["pages"]:
+            last = tail_doc["pages"][-1]
+            entry["next_page"] = last["page"] + 1
+            if last.get("rows"):
+                entry["next_row"] = last["rows"][1] + 1
+
+    def clear(self) -> None:
+        self.entries = {}
+
+    def save(self) -> None:
+        """Write the state file (atomic replace)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(tmp_path, self.path)
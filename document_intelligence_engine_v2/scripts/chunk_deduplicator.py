@@ -0,0 +1,158 @@
+"""
+Near-duplicate chunk elimination before embedding.
+MinHash signatures over word shingles, bucketed with LSH banding, find
+chunks that repeat across the corpus (the same table exported as CSV and
+XLSX, a disclaimer pasted into every report). Each group keeps one
+canonical chunk to embed and index; the others become references on it,
+so they cost no embedding time, index memory or duplicate search hits.
+Chunks from different documents are only folded if they carry the same
+numbers and capitalized names, so filled-in copies of one template (other
+parties, amounts, dates) stay separately searchable.
+"""
+
+import logging
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_WORDS = 3  # words per shingle
+NUM_PERM = 128  # MinHash permutations (signature length)
+BANDS = 32  # LSH bands; chunks sharing any band are compared
+ROWS = NUM_PERM // BANDS  # signature values per band
+SIGNATURE_BATCH = 256  # chunks whose signatures are computed in one vectorized pass
+_WORD = re.compile(r'\w+')
+
+# Metadata kept for each folded duplicate
+REFERENCE_KEYS = ("chunk_id", "doc_id", "chunk_index", "page", "page_end", "section", "rows")
+
+
+class ChunkDeduplicator:
+    """
+    Folds near-duplicate chunks into the first chunk of their group.
+    Chunks are compared by estimated Jaccard similarity of their word
+    shingles; only candidates sharing an LSH band (and the same level,
+    for sentence/chunk/section units) are compared. A candidate from
+    another document must also have the same facts (see _facts).
+    """
+
+    def __init__(self, threshold: float = 0.9, seed: int = 1):
+        """
+        Args:
+            threshold: Minimum estimated Jaccard similarity to fold a chunk
+            seed: Seed for the MinHash permutations
+        """
+        self.threshold = threshold
+        # Permutations h -> (a * h + b) mod 2^64 with odd a (multiply-shift hashing)
+        rng = np.random.RandomState(seed)
+        self._a = (rng.randint(0, 1 << 62, size=NUM_PERM, dtype=np.int64).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.randint(0, 1 << 62, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+        self.last_stats = {"chunks": 0, "canonical": 0, "duplicates": 0}
+
+    def deduplicate(self, chunks: List[Dict]) -> List[Dict]:
+        """
+        Drop near-duplicates from a chunk list.
+
+        Each kept chunk that absorbed duplicates gets a "duplicates" list of
+        references (chunk_id, doc_id, chunk_index, page, page_end, section,
+        rows, similarity), so every document still resolves to the vector.
+
+        Args:
+            chunks: Chunks from ChunkingEngine, in document order
+
+        Returns:
+            Canonical chunks, in their original order
+        """
+        levels = {}  # level -> {band key -> indexes of canonical chunks}
+        signatures = []
+        canonical = []
+        duplicates = 0
+
+        for chunk, (signature, bands) in zip(chunks, self._signatures(chunks)):
+            buckets = levels.setdefault(chunk.get("level"), {})
+            match, similarity = self._best_match(chunk, signature, bands, buckets,
+                                                 signatures, canonical)
+            if match is not None:
+                reference = {key: chunk[key] for key in REFERENCE_KEYS if chunk.get(key) is not None}
+                reference["similarity"] = round(float(similarity), 3)
+                canonical[match].setdefault("duplicates", []).append(reference)
+                duplicates += 1
+                continue
+
+            index = len(canonical)
+            canonical.append(chunk)
+            signatures.append(signature)
+            for key in bands:
+                buckets.setdefault(key, []).append(index)
+
+        self.last_stats = {
+            "chunks": len(chunks),
+            "canonical": len(canonical),
+            "duplicates": duplicates,
+        }
+        logger.info(f"Deduplicated {len(chunks)} chunks: {duplicates} near-duplicates folded "
+                    f"into {len(canonical)} canonical chunks")
+        return canonical
+
+    def _best_match(self, chunk: Dict, signature: np.ndarray, bands: List[Tuple], buckets: Dict,
+                    signatures: List[np.ndarray], canonical: List[Dict]) -> Tuple:
+        """Most similar canonical chunk sharing a band, if similar enough."""
+        candidates = {index for key in bands for index in buckets.get(key, ())}
+        best, best_similarity = None, self.threshold
+        facts = None
+        for index in sorted(candidates):
+            similarity = np.count_nonzero(signatures[index] == signature) / NUM_PERM
+            if similarity < best_similarity:
+                continue
+            if canonical[index].get("doc_id") != chunk.get("doc_id"):
+                if facts is None:
+                    facts = self._facts(chunk.get("text", ""))
+                if self._facts(canonical[index].get("text", "")) != facts:
+                    continue  # e.g. the same template filled in for other parties
+            best, best_similarity = index, similarity
+            if similarity == 1.0:
+                break
+        return best, best_similarity
+
+    @staticmethod
+    def _facts(text: str) -> frozenset:
+        """Numbers and capitalized words (names, places, defined terms) in a text."""
+        return frozenset(word for word in _WORD.findall(text)
+                         if word[0].isupper() or any(ch.isdigit() for ch in word))
+
+    def _signatures(self, chunks: List[Dict]):
+        """
+        Yield (MinHash signature, LSH band keys) per chunk, computed in
+        vectorized batches. A band key hashes the band's ROWS values and
+        its band number into one integer.
+        """
+        salts = np.arange(1, BANDS + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        for start in range(0, len(chunks), SIGNATURE_BATCH):
+            batch = [self._shingles(chunk.get("text", "")) for chunk in chunks[start:start + SIGNATURE_BATCH]]
+            offsets = np.cumsum([0] + [len(shingles) for shingles in batch[:-1]])
+            with np.errstate(over="ignore"):
+                permuted = np.outer(self._a, np.concatenate(batch)) + self._b[:, None]
+                signatures = np.minimum.reduceat(permuted, offsets, axis=1).T
+                bands = signatures.reshape(len(batch), BANDS, ROWS)
+                keys = salts
+                for row in range(ROWS):
+                    keys = keys * np.uint64(0x100000001B3) ^ bands[:, :, row]
+            yield from zip(signatures, keys.tolist())
+
+    @staticmethod
+    def _shingles(text: str) -> np.ndarray:
+        """Distinct hashes of a text's lowercased SHINGLE_WORDS-word shingles."""
+        # Python's str hash is salted per process, which is fine: signatures
+        # are only compared within one deduplicate() call
+        words = _WORD.findall(text.lower()) or [""]
+        hashes = np.fromiter(map(hash, words), dtype=np.int64, count=len(words)).astype(np.uint64)
+        if len(hashes) < SHINGLE_WORDS:
+            return np.unique(hashes)
+        count = len(hashes) - SHINGLE_WORDS + 1
+        shingles = hashes[:count].copy()
+        with np.errstate(over="ignore"):
+            for offset in range(1, SHINGLE_WORDS):
+                shingles = shingles * np.uint64(0x100000001B3) + hashes[offset:offset + count]
+        return np.unique(shingles)
@@ -0,0 +1,99 @@
+"""
+Low-information chunk filter.
+Scores how much of each chunk is boilerplate before embedding, so signature
+blocks, "Date:" lines, page-number fragments and P.O. box addresses are
+ranked lower (or dropped) instead of crowding out real content at query
+time.
+"""
+
+import logging
+import re
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Boilerplate spans; what is left of a chunk once they are removed is its content
+_NOISE = re.compile(
+    r"_{3,}|\.{5,}"                                                  # signature lines, dot leaders
+    r"|\bpage\s+\d+(?:\s*(?:of|/)\s*\d+)?\b"                        # "Page 3 of 12"
+    r"|\b(?:p\.?\s?o\.?\s?box|post office box)\s*[\w-]*"             # P.O. box addresses
+    # Form fields: the label and up to four words of its value, stopping at the next label
+    r"|\b(?:signature|signed|date|dated|name|title|witness|by)\s*:[ \t]*(?:(?![^\s:]+:)[^\s:]+[ \t]*){0,4}"
+    r"|\b(?:sincerely|regards|yours (?:faithfully|truly|sincerely)|for and on behalf of)\b",
+    re.IGNORECASE,
+)
+_LETTER = re.compile(r"[^\W\d_]")  # letters of any script
+
+
+class ChunkFilter:
+    """
+    Scores chunks by the share of their letters left once boilerplate
+    spans are removed, and down-weights or drops those below a minimum
+    score. The score does not depend on length, so short real clauses
+    and non-Latin text keep their full score. Table chunks (CSV/XLSX row
+    groups) are never filtered.
+    """
+
+    def __init__(self, min_score: float = 0.4, mode: str = "downweight", weight: float = 0.5):
+        """
+        Args:
+            min_score: Chunks scoring below this (0-1) count as noise
+            mode: "drop" (noise chunks are removed) or "downweight" (kept
+                  with a "weight" that scales their retrieval score)
+            weight: Weight given to noise chunks in "downweight" mode
+        """
+        if mode not in ("drop", "downweight"):
+            raise ValueError(f"Unknown chunk filter mode: {mode}")
+        self.min_score = min_score
+        self.mode = mode
+        self.weight = weight
+        self.last_stats = {"chunks": 0, "noise": 0}
+
+    @staticmethod
+    def score(text: str) -> float:
+        """
+        Share of a text's letters outside boilerplate spans, from 0
+        (nothing but boilerplate, or no letters at all, like "- 3 -") to
+        1 (no boilerplate).
+        """
+        letters = len(_LETTER.findall(text))
+        if not letters:
+            return 0.0
+        return len(_LETTER.findall(_NOISE.sub(" ", text))) / letters
+
+    def apply(self, chunks: List[Dict]) -> List[Dict]:
+        """
+        Filter chunker output.
+
+        Chunks and section outlines are scored. Sentence units are short
+        by design and are not scored, but those of a dropped chunk are
+        dropped with it.
+
+        Args:
+            chunks: Chunks (and sentence/section units) from ChunkingEngine
+
+        Returns:
+            Chunks to embed, in their original order
+        """
+        kept = []
+        dropped = set()
+        noise = 0
+        for chunk in chunks:
+            level = chunk.get("level", "chunk")
+            if level == "sentence" and chunk.get("parent_id") in dropped:
+                continue
+            if level == "sentence" or chunk.get("rows") or self.score(chunk.get("text", "")) >= self.min_score:
+                kept.append(chunk)
+                continue
+            if level == "chunk":
+                noise += 1
+            if self.mode == "drop":
+                dropped.add(chunk["chunk_id"])
+            else:
+                chunk["weight"] = self.weight
+                kept.append(chunk)
+
+        self.last_stats = {"chunks": len(chunks), "noise": noise}  # noise counts chunk-level units
+        action = "dropped" if self.mode == "drop" else "down-weighted"
+        logger.info(f"Filtered {len(chunks)} chunks: {noise} low-information chunks {action}")
+        return kept
@@ -1,14 +1,32 @@
 """
 Chunking engine for splitting documents into overlapping chunks.
-Maintains document IDs and creates unique chunk identifiers.
+Maintains document IDs and creates content-addressed chunk identifiers.
 """
 
+import hashlib
 import logging
 import re
-from typing import List, Dict
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+_SENTENCE_END = re.compile(r'[.!?] ')  # matched on normalized text, so the space is the only separator
+SEMANTIC_BATCH_SENTENCES = 1024  # sentences embedded per call in semantic mode
+LEVELS = ("sentence", "chunk", "section")  # unit granularities, smallest first
+MIN_SENTENCE_CHARS = 20  # shorter sentences ("Yes.", "See 4.2.") get no sentence unit
+
+
+def make_chunk_id(doc_id: str, text: str, occurrence: int = 0) -> str:
+    """
+    Content-addressed chunk ID: the document ID plus a hash of the chunk's
+    whitespace-normalized text, e.g. "contracts/lease.pdf#9f86d081884c7d65".
+    A chunk keeps its ID when text elsewhere in the document changes; the
+    n-th repeat of the same text within a document gets a "-n" suffix.
+    """
+    digest = hashlib.sha1(f"{doc_id}\n{' '.join(text.split())}".encode("utf-8")).hexdigest()[:16]
+    return f"{doc_id}#{digest}-{occurrence}" if occurrence else f"{doc_id}#{digest}"
+
 
 class ChunkingEngine:
     """
@@ -17,7 +35,9 @@ class ChunkingEngine:
     """
     
     def __init__(self, min_chunk_size: int = 500, max_chunk_size: int = 800,
-                 overlap_ratio: float = 0.10, char_per_token: int = 4):
+                 overlap_ratio: float = 0.10, char_per_token: int = 4,
+                 token_counter=None, sentence_embedder=None,
+                 semantic_threshold: float = 0.5, levels: Iterable[str] = ("chunk",)):
         """
         Initialize the chunking engine.
         
@@ -26,6 +46,15 @@ class ChunkingEngine:
             max_chunk_size: Maximum chunk size in tokens
             overlap_ratio: Overlap ratio (0.10 = 10%)
             char_per_token: Approximate characters per token for estimation
+            token_counter: Optional TokenCounter; when given, chunks are sized
+                           in real tokens and capped at its model window
+            sentence_embedder: Optional EmbeddingEngine; when given, chunks are
+                               also cut at topic shifts (semantic mode)
+            semantic_threshold: Cosine similarity between adjacent sentences
+                                below which semantic mode starts a new chunk
+            levels: Units to emit besides chunks: "sentence" (each sentence,
+                    parent = its chunk) and/or "section" (an outline of each
+                    section, parent of its chunks)
         """
         self.min_chunk_size = min_chunk_size
         self.max_chunk_size = max_chunk_size
@@ -36,13 +65,45 @@ class ChunkingEngine:
         self.min_chunk_chars = int(min_chunk_size * char_per_token)
         self.max_chunk_chars = int(max_chunk_size * char_per_token)
         self.overlap_chars = int(self.max_chunk_chars * overlap_ratio)
+        
+        # Size budget: characters (pieces joined by one separator character),
+        # or exact tokens (whitespace costs none) when a tokenizer is given
+        self.token_counter = token_counter
+        self._budget = self.max_chunk_chars
+        self._separator = 1
+        if token_counter is not None:
+            self.max_chunk_tokens = min(max_chunk_size, token_counter.max_tokens)
+            self._budget = self.max_chunk_tokens
+            self._separator = 0
+            # Character equivalents, for overlap search, carry bounds and estimates
+            self.max_chunk_chars = int(self.max_chunk_tokens * char_per_token)
+            self.overlap_chars = int(self.max_chunk_chars * overlap_ratio)
+        self._min_budget = (min(min_chunk_size, self._budget) if token_counter is not None
+                            else self.min_chunk_chars)
+        
+        # Semantic mode: sentences are embedded in large batches, and the
+        # vectors are averaged into each chunk's embedding
+        self.sentence_embedder = sentence_embedder
+        self.semantic_threshold = semantic_threshold
+        self._pack_batch = SEMANTIC_BATCH_SENTENCES if sentence_embedder is not None else 1
+        
+        unknown = set(levels) - set(LEVELS)
+        if unknown:
+            raise ValueError(f"Unknown chunk levels: {sorted(unknown)}")
+        self.levels = set(levels) | {"chunk"}
     
     def chunk_document(self, doc: Dict) -> List[Dict]:
         """
         Chunk a document into overlapping parts.
         
+        Documents from DocumentLoader carry their content as structured
+        'pages' records; chunks are built from those so page and section
+        travel as chunk metadata. A plain 'text' document is also accepted.
+        With extra levels enabled, sentence and section units are returned
+        alongside the chunks.
+        
         Args:
-            doc: Document dictionary with 'text', 'doc_id', etc.
+            doc: Document dictionary with 'pages' (or 'text'), 'doc_id', etc.
             
         Returns:
             List of chunk dictionaries with:
@@ -52,31 +113,237 @@ class ChunkingEngine:
                 "text": str,
                 "chunk_index": int,
                 "token_count": int,
+                "page": int | None,       # first page the chunk covers
+                "page_end": int | None,   # last page the chunk covers
+                "section": str | None,
+                "level": "sentence" | "chunk" | "section",
+                "parent_id": str | None,  # chunk_id of the enclosing unit
             }
         """
-        text = doc.get("text", "")
         doc_id = doc.get("doc_id", "unknown")
         
-        if not text:
-            logger.warning(f"Document {doc_id} has no text")
-            return []
-        
-        chunks = self._split_text(text)
-        chunk_list = []
-        
-        for i, chunk_text in enumerate(chunks):
-            chunk = {
-                "chunk_id": f"{doc_id}_chunk_{i}",
-                "doc_id": doc_id,
-                "text": chunk_text,
-                "chunk_index": i,
-                "token_count": self._estimate_tokens(chunk_text),
-            }
-            chunk_list.append(chunk)
+        if doc.get("pages") is not None:
+            records = doc["pages"]
+        elif doc.get("text"):
+            records = [{"text": doc["text"], "page": None}]
+        else:
+            records = []
         
-        logger.info(f"Created {len(chunk_list)} chunks from document {doc_id}")
+        chunk_list = list(self.chunk_stream(records, doc_id))
+        if not chunk_list:
+            logger.warning(f"Document {doc_id} has no text")
         return chunk_list
     
+    def chunk_stream(self, records: Iterable[Dict], doc_id: str,
+                     start_index: int = 0, id_scope: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Chunk a stream of raw page/section records (e.g. from
+        DocumentLoader.iter_pages) without materialising the document.
+        
+        Chunks never cross a section boundary; within a section, sentences
+        are packed across pages and the chunk records the page span it
+        covers. Table records (those with a 'rows' span) are already sized
+        in rows and become one chunk each. Only the current record, the
+        chunk being built and the current section's outline are held in
+        memory.
+        
+        Sentence units follow their chunk; a section unit follows the last
+        chunk of its section. chunk_index counts chunks only: sentence
+        units share their chunk's index, section units that of their
+        first chunk.
+        
+        Args:
+            records: Iterable of {"page", "section", "text"} dicts
+            doc_id: Document ID to assign to the chunks
+            start_index: First chunk_index (to continue a document whose
+                         earlier records were already chunked)
+            id_scope: Also hash this into every unit ID (e.g. the byte
+                      offset of an appended tail), so units repeating text
+                      chunked in an earlier call get distinct IDs
+            
+        Yields:
+            Chunk dictionaries in the chunk_document format
+        """
+        units = self._stream_units(records, doc_id, start_index)
+        if id_scope is None:
+            yield from units
+            return
+        # Repeat numbering only covers this call; the scope separates calls
+        for unit in units:
+            # A copy: the generator still reads the chunk's original ID for its sentences
+            parent_id = unit["parent_id"]
+            yield dict(unit, chunk_id=make_chunk_id(doc_id, f"{id_scope} {unit['chunk_id']}"),
+                       parent_id=parent_id and make_chunk_id(doc_id, f"{id_scope} {parent_id}"))
+    
+    def _stream_units(self, records: Iterable[Dict], doc_id: str,
+                      start_index: int) -> Iterator[Dict]:
+        """chunk_stream with IDs unique within this call."""
+        index = start_index
+        seen = {}  # unit ID -> repeats so far, to keep IDs unique within the document
+        for section, group in groupby(records, key=lambda r: r.get("section")):
+            # Known up front so chunks can point at it before the outline is complete
+            section_id = (self._unique_id(doc_id, f"§ {section or ''}", seen)
+                          if "section" in self.levels else None)
+            first, previous = None, ""
+            outline, outline_size = [], 0
+            if section_id and section:
+                outline, outline_size = [section], self._measure([section])[0]
+            for chunk in self._section_chunks(group, doc_id, index, section, section_id, seen):
+                yield chunk
+                index += 1
+                if len(self.levels) == 1:
+                    continue
+                first = first or chunk
+                if chunk.get("rows"):
+                    sentences = chunk["text"].split("\n", 1)[:1]  # a table's header line
+                else:
+                    sentences = self._fresh_sentences(chunk["text"], previous)
+                    previous = chunk["text"]
+                    if "sentence" in self.levels:
+                        for sentence in sentences:
+                            if len(sentence) >= MIN_SENTENCE_CHARS:
+                                yield self._make_chunk(
+                                    doc_id, chunk["chunk_index"], sentence, chunk["page"],
+                                    chunk["page_end"], section, seen=seen,
+                                    level="sentence", parent_id=chunk["chunk_id"],
+                                )
+                # Outline: the first new sentence of each chunk, up to one chunk's size
+                if section_id and sentences and sentences[0] not in outline[-1:]:
+                    size = self._measure(sentences[:1])[0] + (self._separator if outline else 0)
+                    if outline_size + size <= self._budget:
+                        outline.append(sentences[0])
+                        outline_size += size
+                last = chunk
+            if section_id and first:
+                # A one-chunk section is represented by the chunk itself, vector included
+                single = first is last
+                yield self._make_chunk(
+                    doc_id, first["chunk_index"], first["text"] if single else " ".join(outline),
+                    first["page"], last["page_end"], section,
+                    rows=first.get("rows") if single else None,
+                    token_count=first["token_count"] if single else None,
+                    embedding=first.get("embedding") if single else None,
+                    level="section", chunk_id=section_id,
+                )
+        
+        logger.info(f"Created {index - start_index} chunks from document {doc_id}")
+    
+    def _section_chunks(self, group: Iterable[Dict], doc_id: str, index: int,
+                        section: Optional[str], parent_id: Optional[str],
+                        seen: Dict[str, int]) -> Iterator[Dict]:
+        """Chunks of one section's records, numbered from index."""
+        for is_table, run in groupby(group, key=lambda r: bool(r.get("rows"))):
+            if is_table:
+                for record in run:
+                    for text, rows, tokens in self._split_table(record):
+                        yield self._make_chunk(
+                            doc_id, index, text, record.get("page"),
+                            record.get("page"), section, rows=rows,
+                            token_count=tokens, seen=seen, parent_id=parent_id,
+                        )
+                        index += 1
+                continue
+            pieces = ((record.get("text", ""), record.get("page")) for record in run)
+            for chunk_text, page, page_end, tokens, embedding in self._split_stream(pieces):
+                yield self._make_chunk(doc_id, index, chunk_text, page, page_end, section,
+                                       token_count=tokens, embedding=embedding, seen=seen,
+                                       parent_id=parent_id)
+                index += 1
+    
+    @staticmethod
+    def _fresh_sentences(text: str, previous: str) -> List[str]:
+        """
+        Sentences of a chunk's (normalized) text, minus the leading ones
+        carried over from the previous chunk as overlap.
+        """
+        sentences, start = [], 0
+        for match in _SENTENCE_END.finditer(text):
+            sentences.append(text[start:match.start() + 1])
+            start = match.end()
+        if start < len(text):
+            sentences.append(text[start:])
+        skip = 0
+        while skip < len(sentences) and previous and sentences[skip] in previous:
+            skip += 1
+        return sentences[skip:]
+    
+    def _split_table(self, record: Dict) -> Iterator[Tuple[str, List[int], Optional[int]]]:
+        """
+        Yield (text, [first_row, last_row], token count or None) for a table
+        record. A row group wider than the maximum chunk size is split into
+        smaller groups, each starting with the header line. Rows are never
+        cut.
+        """
+        lines = [" ".join(line.split()) for line in record["text"].strip().splitlines()]
+        lines = [line for line in lines if line]
+        first_row, last_row = record["rows"]
+        sizes = self._measure(lines)
+        total = sum(sizes) + self._separator * max(0, len(lines) - 1)
+        tokens = total if self.token_counter else None
+        if total <= self._budget or len(lines) <= 2:
+            yield "\n".join(lines), [first_row, last_row], tokens
+            return
+        
+        header, rows = lines[0], lines[1:]
+        # With a header, rows[i] is source row first_row + i
+        group, group_start = [], 0
+        size = sizes[0]
+        for i, (row, row_size) in enumerate(zip(rows, sizes[1:])):
+            if group and size + self._separator + row_size > self._budget:
+                yield ("\n".join([header] + group), [first_row + group_start, first_row + i - 1],
+                       size if self.token_counter else None)
+                group, group_start, size = [], i, sizes[0]
+            group.append(row)
+            size += self._separator + row_size
+        if group:
+            yield ("\n".join([header] + group), [first_row + group_start, last_row],
+                   size if self.token_counter else None)
+    
+    def _measure(self, texts: List[str]) -> List[int]:
+        """Sizes of texts in the chunk budget's unit (characters or tokens)."""
+        if self.token_counter is None:
+            return [len(text) for text in texts]
+        return self.token_counter.count_batch(texts)
+    
+    def _make_chunk(self, doc_id: str, index: int, chunk_text: str,
+                    page: Optional[int] = None, page_end: Optional[int] = None,
+                    section: Optional[str] = None, rows: Optional[List[int]] = None,
+                    token_count: Optional[int] = None, embedding=None,
+                    seen: Optional[Dict[str, int]] = None, level: str = "chunk",
+                    parent_id: Optional[str] = None, chunk_id: Optional[str] = None) -> Dict:
+        if chunk_id is None:
+            chunk_id = self._unique_id(doc_id, chunk_text, seen)
+        if token_count is None:
+            token_count = (self.token_counter.count(chunk_text) if self.token_counter
+                           else self._estimate_tokens(chunk_text))
+        chunk = {
+            "chunk_id": chunk_id,
+            "doc_id": doc_id,
+            "text": chunk_text,
+            "chunk_index": index,
+            "token_count": token_count,
+            "page": page,
+            "page_end": page_end,
+            "section": section,
+            "level": level,
+            "parent_id": parent_id,
+        }
+        if rows:
+            chunk["rows"] = rows
+        if embedding is not None:
+            chunk["embedding"] = embedding
+        return chunk
+    
+    @staticmethod
+    def _unique_id(doc_id: str, text: str, seen: Optional[Dict[str, int]]) -> str:
+        """make_chunk_id, numbering repeats of the same text via seen."""
+        chunk_id = make_chunk_id(doc_id, text)
+        if seen is None:
+            return chunk_id
+        occurrence = seen.get(chunk_id, 0)
+        seen[chunk_id] = occurrence + 1
+        return make_chunk_id(doc_id, text, occurrence) if occurrence else chunk_id
+    
     def chunk_documents(self, documents: List[Dict]) -> List[Dict]:
         """
         Chunk multiple documents.
@@ -96,90 +363,260 @@ class ChunkingEngine:
         logger.info(f"Total chunks created: {len(all_chunks)}")
         return all_chunks
     
-    def _split_text(self, text: str) -> List[str]:
+    def chunk_store(self, store) -> List[Dict]:
         """
-        Split text into overlapping chunks.
+        Chunk every document in an ExtractionStore.
         
-        Strategy:
-        1. Split by sentences to maintain semantic boundaries
-        2. Group sentences into chunks of target size
-        3. Add overlap between chunks
-        """
-        # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        Records are streamed from the columnar file one document at a time,
+        so re-chunking with new sizes never re-parses or re-OCRs a file.
         
-        # Split into sentences (simple approach)
-        sentences = self._split_sentences(text)
+        Args:
+            store: ExtractionStore written at ingest time
+            
+        Returns:
+            List of all chunks from all stored documents
+        """
+        all_chunks = []
         
-        if not sentences:
-            return [text] if text else []
+        for doc_id, records in store.iter_documents():
+            all_chunks.extend(self.chunk_stream(records, doc_id))
         
-        chunks = []
-        current_chunk = ""
-        current_chars = 0
-        previous_overlap = ""
+        logger.info(f"Total chunks created from store: {len(all_chunks)}")
+        return all_chunks
+    
+    def estimate_chunk_count(self, chars: int) -> int:
+        """
+        Approximate number of chunks `chars` characters of prose produce
+        (each chunk advances by max_chunk_chars minus the overlap).
+        """
+        step = max(1, self.max_chunk_chars - self.overlap_chars)
+        return -(-chars // step)
+    
+    def split_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Chunk boundaries of a text as character offsets.
         
-        for i, sentence in enumerate(sentences):
-            sentence = sentence.strip()
-            if not sentence:
-                continue
+        Args:
+            text: Raw text
             
-            sentence_chars = len(sentence)
+        Returns:
+            (start, end) spans into normalize_text(text), one per chunk
+        """
+        return [span[:2] for span in self._span_stream([(text, None)], ["", 0])]
+    
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Collapse whitespace runs to single spaces and strip the ends."""
+        return " ".join(text.split())
+    
+    def _split_stream(self, pieces: Iterable[Tuple[str, Optional[int]]]) -> Iterator[Tuple]:
+        """
+        Split a sequence of (text, page) pieces into overlapping chunks,
+        treating them as one whitespace-joined text.
+        
+        Yields:
+            (chunk text, first page, last page, token count or None when
+            sizing by characters, embedding or None outside semantic mode)
+        """
+        window = ["", 0]
+        for start, end, first_page, last_page, size, embedding in self._span_stream(pieces, window):
+            buf, base = window
+            tokens = size if self.token_counter else None
+            yield buf[start - base:end - base], first_page, last_page, tokens, embedding
+    
+    def _span_stream(self, pieces: Iterable[Tuple[str, Optional[int]]],
+                     window: List) -> Iterator[Tuple]:
+        """
+        Compute chunk spans over the normalized pieces joined by single
+        spaces, without building any intermediate strings.
+        
+        Sentences are (start, end) offsets found by scanning for sentence
+        punctuation followed by a space; chunks are runs of consecutive
+        sentences, and a chunk's overlap is a suffix of the previous span,
+        so chunk text is only sliced out by the caller. The last sentence
+        of each piece may continue in the next one, so it is carried over
+        rather than packed immediately; a carry that grows past the maximum
+        chunk size (text without sentence punctuation) is packed as-is to
+        keep memory bounded.
+        
+        In semantic mode, sentences are queued until SEMANTIC_BATCH_SENTENCES
+        are ready and embedded in one call. A chunk that has reached the
+        minimum size is also closed (without overlap) where the similarity
+        of adjacent sentences falls below semantic_threshold, and its
+        embedding is the normalized mean of its whole sentences' vectors.
+        
+        Args:
+            pieces: (text, page) pairs
+            window: [buffer, offset of buffer[0]], updated in place; only
+                    the text of the open chunk, carry and queued sentences
+                    is kept, and buffer[start - offset:end - offset] is a
+                    yielded span
             
-            # Add space before sentence (except first)
-            if current_chunk:
-                test_chunk = current_chunk + " " + sentence
+        Yields:
+            (start, end, first page, last page, size, embedding) with offsets
+            into the joined text and size in characters or tokens
+        """
+        buf, base = "", 0
+        # Open chunk: [start, end, first page, last page, size, sentence vectors]
+        # with offsets into buf; vectors are (joined-text start, vector) pairs
+        chunk = None
+        carry_start, carry_page = None, None
+        queued = []  # (start, end, page) sentences awaiting packing, joined-text offsets
+        previous_vector = None
+        
+        def finish(closed):
+            embedding = self._mean_vector(closed[5]) if self.sentence_embedder else None
+            return closed[0] + base, closed[1] + base, closed[2], closed[3], closed[4], embedding
+        
+        def pack(sentences):
+            """Add (start, end, page) sentences to the open chunk, yielding finished ones."""
+            nonlocal chunk, previous_vector
+            measured = self._measure_sentences(buf, [(start - base, end - base, page)
+                                                     for start, end, page in sentences])
+            vectors = self._sentence_vectors(buf, measured)
+            for (start, end, page, size), vector in zip(measured, vectors):
+                if chunk is None:
+                    chunk = [start, end, page, page, size, []]
+                elif chunk[4] + self._separator + size > self._budget:
+                    finished = chunk
+                    chunk = self._next_chunk(buf, base, finished, start, end, page, size)
+                    yield finish(finished)
+                elif (vector is not None and chunk[4] >= self._min_budget
+                      and float(previous_vector @ vector) < self.semantic_threshold):
+                    # Topic shift: no overlap, it would carry the old topic over
+                    finished = chunk
+                    chunk = [start, end, page, page, size, []]
+                    yield finish(finished)
+                else:
+                    chunk[1] = end
+                    chunk[4] += self._separator + size
+                    if chunk[2] is None:
+                        chunk[2] = page
+                    chunk[3] = page
+                if vector is not None:
+                    chunk[5].append((start + base, vector))
+                    previous_vector = vector
+        
+        for text, page in pieces:
+            text = self.normalize_text(text)
+            if not text:
+                continue
+            if buf:
+                join = len(buf) + 1
+                buf = f"{buf} {text}"
             else:
-                test_chunk = sentence
+                join = 0
+                base += 1 if base else 0  # the joining space before this piece
+                buf = text
+            window[0], window[1] = buf, base
             
-            test_chars = len(test_chunk)
+            start = join if carry_start is None else carry_start
+            start_page = page if carry_start is None else carry_page
+            for match in _SENTENCE_END.finditer(buf, start):
+                end = match.start() + 1
+                queued.append((start + base, end + base, start_page))
+                start, start_page = end + 1, page
             
-            # Check if adding this sentence exceeds max chunk size
-            if test_chars > self.max_chunk_chars and current_chunk:
-                # Save current chunk with overlap
-                chunks.append(current_chunk)
-                previous_overlap = self._create_overlap(current_chunk)
-                
-                # Start new chunk with overlap
-                current_chunk = previous_overlap + " " + sentence
-                current_chars = len(current_chunk)
-            else:
-                # Add to current chunk
-                current_chunk = test_chunk
-                current_chars = test_chars
+            carry_start, carry_page = start, start_page
+            if len(buf) - start > self.max_chunk_chars:
+                queued.append((start + base, len(buf) + base, start_page))
+                carry_start, carry_page = None, None
+            if len(queued) >= self._pack_batch:
+                yield from pack(queued)
+                queued = []
+            
+            # Drop text no longer needed by the open chunk, queue or carry
+            keep = min(chunk[0] if chunk else len(buf),
+                       queued[0][0] - base if queued else len(buf),
+                       len(buf) if carry_start is None else carry_start)
+            if keep:
+                buf, base = buf[keep:], base + keep
+                if chunk:
+                    chunk[0] -= keep
+                    chunk[1] -= keep
+                if carry_start is not None:
+                    carry_start -= keep
+        
+        window[0], window[1] = buf, base
+        if carry_start is not None:
+            queued.append((carry_start + base, len(buf) + base, carry_page))
+        if queued:
+            yield from pack(queued)
         
         # Add final chunk
-        if current_chunk:
-            chunks.append(current_chunk)
+        if chunk:
+            yield finish(chunk)
+    
+    def _measure_sentences(self, buf: str, sentences: List[Tuple]) -> List[Tuple]:
+        """
+        Attach sizes to (start, end, page) sentence spans, batch-counting
+        tokens in tokenizer mode. There, a sentence over the chunk budget is
+        cut into pieces that fit, so no chunk exceeds the model window.
+        """
+        if self.token_counter is None:
+            return [(start, end, page, end - start) for start, end, page in sentences]
         
-        return chunks
+        counts = self.token_counter.count_batch([buf[start:end] for start, end, _ in sentences])
+        measured = []
+        for (start, end, page), count in zip(sentences, counts):
+            if count <= self._budget:
+                measured.append((start, end, page, count))
+                continue
+            spans = self.token_counter.split(buf[start:end], self._budget)
+            sizes = self.token_counter.count_batch([buf[start + a:start + b] for a, b in spans])
+            measured.extend((start + a, start + b, page, size) for (a, b), size in zip(spans, sizes))
+        return measured
+    
+    def _sentence_vectors(self, buf: str, measured: List[Tuple]) -> List:
+        """Unit vectors of measured sentences (one batch call), or Nones outside semantic mode."""
+        if self.sentence_embedder is None or not measured:
+            return [None] * len(measured)
+        return list(self.sentence_embedder.embed_sentences(
+            [buf[start:end] for start, end, _, _ in measured]
+        ))
     
-    def _split_sentences(self, text: str) -> List[str]:
+    @staticmethod
+    def _mean_vector(vectors: List[Tuple]):
+        """Normalized mean of a chunk's (start, vector) sentence vectors."""
+        mean = sum(vector for _, vector in vectors) / len(vectors)
+        norm = float(mean @ mean) ** 0.5
+        return mean / norm if norm else mean
+    
+    def _next_chunk(self, buf: str, base: int, finished: List, start: int, end: int,
+                    page: Optional[int], size: int) -> List:
         """
-        Split text into sentences using regex.
+        Open the chunk that follows `finished` with the sentence
+        buf[start:end], prefixed by the overlap taken from `finished`.
         """
-        # Split on common sentence endings
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        return [s for s in sentences if s.strip()]
+        overlap_start = self._overlap_start(buf, finished[0], finished[1], start)
+        if overlap_start == start:
+            return [start, end, page, page, size, []]
+        if self.token_counter is None:
+            overlap_size = finished[1] - overlap_start + self._separator
+        else:
+            overlap_size = self.token_counter.count(buf[overlap_start:finished[1]])
+            if overlap_size + size > self._budget:
+                # No room for the overlap without overflowing the model window
+                return [start, end, page, page, size, []]
+        # Whole sentences inside the overlap keep contributing their vectors
+        vectors = [(s, v) for s, v in finished[5] if s >= overlap_start + base]
+        return [overlap_start, end, finished[3], page, overlap_size + size, vectors]
     
-    def _create_overlap(self, chunk: str) -> str:
+    def _overlap_start(self, buf: str, start: int, end: int, next_start: int) -> int:
         """
-        Create overlap text from the end of a chunk.
-        Returns the last portion of the chunk to use as overlap.
+        Start offset of the overlap carried from the chunk buf[start:end]
+        into the next chunk: the last overlap_chars characters, moved
+        forward to a sentence boundary when one falls inside them.
         """
-        if len(chunk) <= self.overlap_chars:
-            return chunk
-        
-        # Find last sentence boundary within overlap range
-        overlap_start = len(chunk) - self.overlap_chars
-        text_slice = chunk[overlap_start:]
-        
-        # Try to start from sentence boundary
-        sentence_split = text_slice.rfind('. ')
-        if sentence_split > 0:
-            return text_slice[sentence_split + 2:]
-        
-        return text_slice
+        if end - start <= self.overlap_chars:
+            return start
+        if not self.overlap_chars:
+            return next_start
+        overlap_start = end - self.overlap_chars
+        boundary = buf.rfind('. ', overlap_start, end)
+        if boundary > overlap_start:
+            return boundary + 2
+        return overlap_start
     
     @staticmethod
     def _estimate_tokens(text: str, char_per_token: int = 4) -> int:
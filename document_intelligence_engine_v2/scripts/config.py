@@ -10,10 +10,14 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 VECTOR_STORE_DIR = PROJECT_ROOT / "vector_store"
+CACHE_DIR = PROJECT_ROOT / ".cache"
+
+
+def ensure_directories() -> None:
+    """Create the data and vector store directories (called by commands that write them)."""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    VECTOR_STORE_DIR.mkdir(parents=True, exist_ok=True)
 
-# Ensure directories exist
-DATA_DIR.mkdir(parents=True, exist_ok=True)
-VECTOR_STORE_DIR.mkdir(parents=True, exist_ok=True)
 
 # ===== Document Loader Configuration =====
 SUPPORTED_FORMATS = {
@@ -22,6 +26,44 @@ SUPPORTED_FORMATS = {
     ".csv": "csv",
     ".xlsx": "xlsx",
 }
+SCAN_INCLUDE = None  # glob patterns files under DATA_DIR must match, e.g. ["*.pdf", "*.csv"] (None = all)
+SCAN_EXCLUDE = []  # glob patterns for files/directories to skip, e.g. ["drafts/*", "*.tmp"]
+SCAN_MAX_DEPTH = None  # subdirectory levels to descend into DATA_DIR (0 = top level only, None = all)
+INGEST_WORKERS = 1  # extraction processes for load_directory (1 = sequential)
+EXTRACT_TIMEOUT = None  # per-file extraction budget in seconds, e.g. 600 (None = no isolation)
+EXTRACT_MAX_RSS_MB = None  # per-file memory budget in MB, e.g. 4096, including OCR/rasterizer subprocesses (None = no isolation)
+USE_EXTRACTION_CACHE = True  # reuse raw extractions of files with unchanged content
+EXTRACTION_CACHE_DIR = CACHE_DIR / "extraction"
+USE_EXTRACTION_STORE = True  # keep extracted records in Parquet so `main.py rechunk` skips parsing
+EXTRACTION_STORE_PATH = VECTOR_STORE_DIR / "extraction.parquet"
+APPEND_STATE_PATH = VECTOR_STORE_DIR / "append_state.json"  # per-file ingested offset, for `ingest --append`
+PDF_BACKEND = "auto"  # "auto" (PyMuPDF if installed, else PyPDF2), "pymupdf" or "pypdf2"
+PDF_PAGE_WORKERS = 1  # processes extracting page ranges of a single PDF
+PDF_PAGES_PER_TASK = 16  # pages per page-worker task (and per OCR batch)
+OCR_DPI = 200  # rasterization resolution for pages without a text layer
+OCR_WORKERS = 4  # concurrent tesseract processes
+OCR_CACHE_DIR = CACHE_DIR / "ocr"  # OCR text cached by page-image hash
+TABLE_ROWS_PER_CHUNK = 20  # CSV/XLSX rows per chunk; the header row is repeated in each
+TEXT_STREAM_THRESHOLD = 8 * 1024 * 1024  # text/log files above this (bytes) are memory-mapped
+TEXT_BLOCK_BYTES = 1024 * 1024  # bytes decoded at a time from a memory-mapped file
+HTML_PARSER = "auto"  # "auto" (lxml if installed, else BeautifulSoup), "lxml" or "bs4"
+STRIP_BOILERPLATE = True  # drop header/footer lines repeated across a PDF/PPTX document's pages
+ARCHIVE_MEMBER_MAX_MB = 256  # zip/tar members larger than this (uncompressed) are quarantined
+
+# Options handed to DocumentLoader (see document_loader.DEFAULT_OPTIONS)
+EXTRACT_OPTIONS = {
+    "pdf_backend": PDF_BACKEND,
+    "pdf_page_workers": PDF_PAGE_WORKERS,
+    "pdf_pages_per_task": PDF_PAGES_PER_TASK,
+    "ocr_dpi": OCR_DPI,
+    "ocr_workers": OCR_WORKERS,
+    "ocr_cache_dir": str(OCR_CACHE_DIR),
+    "table_rows_per_chunk": TABLE_ROWS_PER_CHUNK,
+    "text_stream_threshold": TEXT_STREAM_THRESHOLD,
+    "text_block_bytes": TEXT_BLOCK_BYTES,
+    "html_parser": HTML_PARSER,
+    "archive_member_max_bytes": ARCHIVE_MEMBER_MAX_MB * 1024 * 1024,
+}
 
 # ===== Chunking Configuration =====
 # Token count (approximate: 1 token ≈ 4 characters for English)
@@ -29,6 +71,15 @@ MIN_CHUNK_SIZE = 100  # minimum tokens per chunk
 MAX_CHUNK_SIZE = 200  # maximum tokens per chunk
 CHUNK_OVERLAP = 0.10  # 10% overlap between chunks
 CHAR_PER_TOKEN = 4  # approximate characters per token for estimation
+CHUNK_SIZING = "chars"  # "chars" (CHAR_PER_TOKEN estimate) or "tokenizer" (exact counts with EMBEDDING_MODEL's fast tokenizer; chunks never exceed EMBEDDING_MAX_TOKENS)
+CHUNKING_MODE = "sentence"  # "sentence" (pack sentences by size) or "semantic" (also cut where adjacent sentences' embeddings diverge; chunk vectors reuse the sentence vectors)
+SEMANTIC_THRESHOLD = 0.5  # adjacent-sentence cosine similarity below which semantic mode starts a new chunk
+INDEX_LEVELS = ("chunk",)  # add "sentence" and/or "section" to also index each sentence (pinpoint questions) and a per-section outline (broad questions); the retriever picks the level per query
+NOISE_FILTER = "downweight"  # "off", "downweight" (low-information chunks such as signature blocks, "Date:" lines and page-number fragments are embedded but ranked lower) or "drop" (not embedded)
+NOISE_MIN_SCORE = 0.4  # share of a chunk's letters outside signature/date/page-number spans below which it counts as noise
+NOISE_WEIGHT = 0.5  # retrieval score multiplier for noise chunks in "downweight" mode
+DEDUP_CHUNKS = False  # fold near-duplicate chunks (MinHash over word shingles) into one indexed chunk before embedding
+DEDUP_THRESHOLD = 0.9  # estimated Jaccard similarity of 3-word shingles at which chunks count as duplicates; chunks from different documents must also share their numbers and names
 
 # Derived chunk sizes in characters
 MIN_CHUNK_CHARS = int(MIN_CHUNK_SIZE * CHAR_PER_TOKEN)
@@ -39,6 +90,7 @@ OVERLAP_CHARS = int(MAX_CHUNK_CHARS * CHUNK_OVERLAP)
 # Using sentence-transformers for semantic embeddings
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # Fast, lightweight (22MB), good quality
 EMBEDDING_DIMENSION = 384  # Output dimension of all-MiniLM-L6-v2
+EMBEDDING_MAX_TOKENS = 256  # Input window of all-MiniLM-L6-v2 in word-pieces (longer text is truncated)
 BATCH_SIZE = 32  # Batch size for embedding generation
 DEVICE = "cpu"  # "cpu" or "cuda" - will auto-select if GPU available
 
@@ -18,7 +18,7 @@ class ContextBuilder:
     
     def __init__(self, redundancy_threshold: float = 0.9,
                  max_context_tokens: int = 2000,
-                 char_per_token: int = 4):
+                 char_per_token: int = 4, token_counter=None):
         """
         Initialize the context builder.
         
@@ -26,11 +26,14 @@ class ContextBuilder:
             redundancy_threshold: Similarity threshold to consider chunks redundant
             max_context_tokens: Maximum tokens in final context
             char_per_token: Approximate characters per token
+            token_counter: Optional TokenCounter; when given, the context is
+                           limited and reported in counted tokens
         """
         self.redundancy_threshold = redundancy_threshold
         self.max_context_tokens = max_context_tokens
         self.max_context_chars = int(max_context_tokens * char_per_token)
         self.char_per_token = char_per_token
+        self.token_counter = token_counter
     
     def build_context(self, retrieved_chunks: List[Dict],
                      query: str = "") -> Dict:
@@ -79,7 +82,10 @@ class ContextBuilder:
         context_str = self._build_context_string(final_chunks)
         
         # Calculate statistics
-        context_tokens = self._estimate_tokens(context_str)
+        if self.token_counter:
+            context_tokens = self.token_counter.count(context_str)
+        else:
+            context_tokens = self._estimate_tokens(context_str)
         context_chars = len(context_str)
         
         result = {
@@ -147,13 +153,19 @@ class ContextBuilder:
             List of chunks within token limit
         """
         final_chunks = []
-        total_chars = 0
+        total = 0
         
-        for chunk in chunks:
-            chunk_text = chunk.get("text", "")
-            chunk_chars = len(chunk_text)
-            
-            if total_chars + chunk_chars > self.max_context_chars:
+        # Sizes in counted tokens, or characters against the derived budget
+        texts = [chunk.get("text", "") for chunk in chunks]
+        if self.token_counter:
+            sizes = self.token_counter.count_batch(texts)
+            limit = self.max_context_tokens
+        else:
+            sizes = [len(text) for text in texts]
+            limit = self.max_context_chars
+        
+        for chunk, size in zip(chunks, sizes):
+            if total + size > limit:
                 logger.info(
                     f"Reached max context size. "
                     f"Included {len(final_chunks)} chunks"
@@ -161,7 +173,7 @@ class ContextBuilder:
                 break
             
             final_chunks.append(chunk)
-            total_chars += chunk_chars
+            total += size
         
         return final_chunks
     
@@ -197,14 +209,33 @@ class ContextBuilder:
                 chunk_id = chunk.get("chunk_id", "unknown")
                 text = chunk.get("text", "")
                 score = chunk.get("combined_score", 0)
+                location = self._format_location(chunk)
                 
-                context_parts.append(f"[{chunk_id}] (score: {score:.3f})\n")
+                context_parts.append(f"[{chunk_id}]{location} (score: {score:.3f})\n")
+                for duplicate in chunk.get("duplicates", []):
+                    # Near-duplicate folded into this chunk at ingest
+                    location = self._format_location(duplicate)
+                    context_parts.append(f"Also in: {duplicate.get('doc_id', 'unknown')}{location}\n")
                 context_parts.append(text)
                 context_parts.append("\n\n")
         
         context_str = "".join(context_parts).strip()
         return context_str
     
+    @staticmethod
+    def _format_location(chunk: Dict) -> str:
+        """Render a chunk's section/page metadata, e.g. ' Section: X | Pages: 3-4'."""
+        parts = []
+        if chunk.get("section"):
+            parts.append(f"Section: {chunk['section']}")
+        page, page_end = chunk.get("page"), chunk.get("page_end")
+        if page is not None:
+            if page_end is not None and page_end != page:
+                parts.append(f"Pages: {page}-{page_end}")
+            else:
+                parts.append(f"Page: {page}")
+        return " " + " | ".join(parts) if parts else ""
+    
     @staticmethod
     def _cosine_similarity(embedding1: np.ndarray,
                           embedding2: np.ndarray) -> float:
@@ -8,101 +8,128 @@ Supported formats:
     Text formats:   TXT, MD, RST, HTML, HTM, XML, JSON, YAML, YML, TOML, INI, CFG
     Code formats:   PY, JS, TS, JAVA, C, CPP, H, CS, GO, RS, RB, PHP, SWIFT, KT, R, SQL
     Data formats:   EPUB, RTF, ODT, ODS, ODP
-    Fallback:       Any other text-based file via raw UTF-8 read
+    Archives:       ZIP, TAR, TAR.GZ, TGZ, TAR.BZ2, TAR.XZ (members streamed, never unpacked)
+    Fallback:       Any other file whose content sniffs as text (binaries are rejected)
 """
 
+import codecs
+import hashlib
+import importlib
+import io
 import json
 import logging
+import mmap
+import multiprocessing
+import os
+import posixpath
 import re
 import csv
+import fnmatch
+import signal
+import tarfile
+import tempfile
+import time
+import zipfile
+from xml.etree import ElementTree
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
-CHUNK_SIZE = 1000  # characters per chunk (Version 1 proven value)
+# Bump whenever extractor output changes so cached extractions are invalidated
+EXTRACTOR_VERSION = "10"
+
+# Extraction options; DocumentLoader overrides these per instance.
+# Keys ending in "_workers" or "_cache_dir" only affect speed, never output.
+DEFAULT_OPTIONS = {
+    "pdf_backend": "auto",       # "auto" (fastest installed), "pymupdf" or "pypdf2"
+    "pdf_page_workers": 1,       # processes extracting page ranges of one PDF
+    "pdf_pages_per_task": 16,    # pages handed to each page worker / OCR batch
+    "ocr_dpi": 200,              # rasterization resolution for image-only pages
+    "ocr_workers": 4,            # concurrent tesseract processes
+    "ocr_cache_dir": None,       # directory caching OCR text by page-image hash
+    "table_rows_per_chunk": 20,  # CSV/XLSX rows per record (header repeated in each)
+    "text_stream_threshold": 8 * 1024 * 1024,  # bytes; larger text files are memory-mapped
+    "text_block_bytes": 1024 * 1024,           # bytes decoded per block when memory-mapped
+    "html_parser": "auto",       # "auto" (lxml if installed), "lxml" or "bs4"
+    "archive_member_max_bytes": 256 * 1024 * 1024,  # larger archive members are quarantined
+}
 
 # ---------------------------------------------------------------------------
-# Optional imports — fail gracefully if library not installed
+# Optional imports — loaded on first use, fail gracefully if not installed
 # ---------------------------------------------------------------------------
 
-try:
-    import PyPDF2
-except ImportError:
-    PyPDF2 = None
-
-try:
-    import fitz  # PyMuPDF fallback for PDFs
-except ImportError:
-    fitz = None
-
-try:
-    from pdf2image import convert_from_path
-    import pytesseract
-    OCR_AVAILABLE = True
-except ImportError:
-    OCR_AVAILABLE = False
-
-try:
-    from docx import Document as DocxDocument
-except ImportError:
-    DocxDocument = None
-
-try:
-    import openpyxl
-except ImportError:
-    openpyxl = None
-
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
-
-try:
-    from pptx import Presentation
-except ImportError:
-    Presentation = None
-
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    BeautifulSoup = None
-
-try:
-    import ebooklib
-    from ebooklib import epub
-except ImportError:
-    ebooklib = None
-    epub = None
-
-try:
-    import striprtf.striprtf as striprtf_module
-except ImportError:
-    striprtf_module = None
+class _LazyModule:
+    """
+    Stand-in for an optional dependency, imported the first time it is
+    used. It is truthy only if the import succeeds, so `if fitz:` both
+    checks availability and loads the module; attribute access on a
+    missing module raises ImportError.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._missing = False
+
+    def _load(self):
+        if self._module is None and not self._missing:
+            try:
+                self._module = importlib.import_module(self._name)
+            except ImportError:
+                self._missing = True
+        return self._module
+
+    def __bool__(self) -> bool:
+        return self._load() is not None
+
+    def __getattr__(self, attr: str):
+        module = self._load()
+        if module is None:
+            raise ImportError(f"{self._name} is not installed")
+        return getattr(module, attr)
+
+
+PyPDF2 = _LazyModule("PyPDF2")
+fitz = _LazyModule("fitz")  # PyMuPDF
+pytesseract = _LazyModule("pytesseract")
+pdf2image = _LazyModule("pdf2image")
+Image = _LazyModule("PIL.Image")
+openpyxl = _LazyModule("openpyxl")
+bs4 = _LazyModule("bs4")
+lxml_html = _LazyModule("lxml.html")
+ebooklib = _LazyModule("ebooklib")
+epub = _LazyModule("ebooklib.epub")
+striprtf_module = _LazyModule("striprtf.striprtf")
+
+
+def _ocr_available() -> bool:
+    """OCR needs tesseract plus a rasterizer (PyMuPDF preferred, pdf2image otherwise)."""
+    return bool(pytesseract) and ((bool(fitz) and bool(Image)) or bool(pdf2image))
 
 
 # ---------------------------------------------------------------------------
-# Chunking helper (from Version 1)
+# Record helper
 # ---------------------------------------------------------------------------
 
-def _chunk_text(text: str, source_name: str, page_num: int,
-                section: Optional[str] = None) -> List[Dict]:
-    """Split text into fixed-size chunks, preserving source/page/section metadata."""
-    chunks = []
-    text = text.strip().replace("\n", " ")
-    text = re.sub(r'\s+', ' ', text)
+def _page_records(text: str, source_name: str, page_num: int,
+                  section: Optional[str] = None) -> List[Dict]:
+    """
+    Wrap one page/section of text as a raw record. Text is kept whole
+    (line breaks included); ChunkingEngine does the only chunking pass.
+    """
+    text = text.strip()
     if not text:
-        return chunks
-    for i in range(0, len(text), CHUNK_SIZE):
-        chunk = text[i:i + CHUNK_SIZE]
-        if chunk.strip():
-            chunks.append({
-                "source": source_name,
-                "page": page_num,
-                "section": section,
-                "text": chunk,
-            })
-    return chunks
+        return []
+    return [{
+        "source": source_name,
+        "page": page_num,
+        "section": section,
+        "text": text,
+    }]
 
 
 # ---------------------------------------------------------------------------
@@ -120,202 +147,689 @@ def _detect_heading_pdf(line: str) -> Optional[str]:
     return None
 
 
-def _detect_heading_docx(paragraph) -> Optional[str]:
-    if "Heading" in paragraph.style.name:
-        return paragraph.text.strip() or None
+def _detect_heading_docx(style_name: Optional[str], text: str) -> Optional[str]:
+    # styles.xml names built-in styles "heading 1"; Word shows "Heading 1"
+    if style_name and "heading" in style_name.lower():
+        return text.strip() or None
     return None
 
 
 # ---------------------------------------------------------------------------
 # Per-format extractors
+#
+# Every extractor is a generator yielding raw {source, page, section, text}
+# records as it reads, so callers can stream a document page by page.
 # ---------------------------------------------------------------------------
 
-def _extract_pdf(file_path: Path) -> List[Dict]:
-    chunks = []
-    name = file_path.name
+PDF_BACKENDS = ("pymupdf", "pypdf2")  # fastest first
+
+# Candidate heading lines: no ASCII lowercase and at least one capital, or
+# a short line ending in a colon. Confirmed with _detect_heading_pdf.
+_PDF_HEADING_RE = re.compile(
+    r'^[^\S\n]*(?:[^\na-z]*[A-Z][^\na-z]*|[^\n]{1,78}:)[^\S\n]*$',
+    re.MULTILINE,
+)
+
+
+def _last_pdf_heading(text: str) -> Optional[str]:
+    """Return the last heading line on a page (regex scan, no per-line loop)."""
+    for match in reversed(_PDF_HEADING_RE.findall(text)):
+        heading = _detect_heading_pdf(match)
+        if heading:
+            return heading
+    return None
 
-    # Try PyPDF2 first (Version 1 approach)
-    if PyPDF2:
+
+def _fitz_open(file_path: Path):
+    if isinstance(file_path, ArchiveMember):
+        return fitz.open(stream=file_path.read_bytes(), filetype="pdf")
+    return fitz.open(file_path)
+
+
+class _PdfHandle:
+    """A PDF opened once with one backend."""
+
+    def __init__(self, file_path: Path, backend: str):
+        self.backend = backend
+        self._file = None
+        if backend == "pymupdf":
+            self._doc = _fitz_open(file_path)
+            self.page_count = len(self._doc)
+        else:
+            self._file = file_path.open('rb')
+            try:
+                self._doc = PyPDF2.PdfReader(self._file)
+                self.page_count = len(self._doc.pages)
+            except Exception:
+                self._file.close()
+                raise
+
+    @property
+    def fitz_doc(self):
+        """The underlying PyMuPDF document, if this handle uses PyMuPDF."""
+        return self._doc if self.backend == "pymupdf" else None
+
+    def page_text(self, index: int) -> str:
+        if self.backend == "pymupdf":
+            return self._doc[index].get_text()
+        return self._doc.pages[index].extract_text() or ""
+
+    def close(self) -> None:
+        if self.backend == "pymupdf":
+            self._doc.close()
+        if self._file:
+            self._file.close()
+
+
+def _pdf_backend_order(preferred: str) -> List[str]:
+    """Installed backends, preferred (or fastest) first."""
+    installed = {"pymupdf": bool(fitz), "pypdf2": bool(PyPDF2)}
+    order = [b for b in PDF_BACKENDS if installed[b]]
+    if preferred in order:
+        order.remove(preferred)
+        order.insert(0, preferred)
+    elif preferred != "auto":
+        logger.warning(f"PDF backend '{preferred}' not installed, using {order[:1]}")
+    return order
+
+
+def _open_pdf(file_path: Path, backends: List[str]) -> Optional[_PdfHandle]:
+    for backend in backends:
         try:
-            with open(file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                for page_num, page in enumerate(reader.pages, start=1):
-                    text = page.extract_text() or ""
-                    section = None
-                    if text.strip():
-                        for line in text.split("\n"):
-                            h = _detect_heading_pdf(line)
-                            if h:
-                                section = h
-                        chunks.extend(_chunk_text(text, name, page_num, section))
-                    elif OCR_AVAILABLE:
-                        images = convert_from_path(file_path, first_page=page_num, last_page=page_num)
-                        for img in images:
-                            ocr_text = pytesseract.image_to_string(img)
-                            chunks.extend(_chunk_text(ocr_text, name, page_num, section))
-            if chunks:
-                return chunks
+            return _PdfHandle(file_path, backend)
         except Exception as e:
-            logger.warning(f"PyPDF2 failed for {name}: {e}, trying PyMuPDF...")
+            logger.warning(f"{backend} could not open {file_path.name}: {e}")
+    return None
+
+
+def _read_pdf_page(file_path: Path, handle: _PdfHandle, fallbacks: Dict,
+                   backends: List[str], index: int):
+    """
+    Read one page's text layer. A page the primary backend cannot read is
+    retried with the next backend for that page only.
 
-    # Fallback to PyMuPDF
-    if fitz:
+    Returns:
+        (text or None if unreadable, backend that produced it)
+    """
+    name = file_path.name
+    try:
+        return handle.page_text(index), handle.backend
+    except Exception as e:
+        logger.warning(f"{handle.backend} failed on {name} page {index + 1}: {e}")
+    for alt in backends:
+        if alt == handle.backend:
+            continue
+        if alt not in fallbacks:
+            fallbacks[alt] = _open_pdf(file_path, [alt])
+        if fallbacks[alt] is None:
+            continue
         try:
-            doc = fitz.open(file_path)
-            for page_num in range(len(doc)):
-                text = doc[page_num].get_text()
-                chunks.extend(_chunk_text(text, name, page_num + 1))
-            doc.close()
-            return chunks
+            return fallbacks[alt].page_text(index), alt
         except Exception as e:
-            logger.error(f"PyMuPDF also failed for {name}: {e}")
+            logger.warning(f"{alt} failed on {name} page {index + 1}: {e}")
+    return None, handle.backend
 
-    logger.error(f"Could not extract PDF: {name}")
-    return chunks
 
+def _iter_pdf_pages(file_path: Path, backends: List[str], start: int, end: int,
+                    options: Dict, handle: Optional[_PdfHandle] = None) -> Iterator[Dict]:
+    """
+    Yield records for pages [start, end) using one open document.
 
-def _extract_docx(file_path: Path) -> List[Dict]:
-    chunks = []
+    Pages are read in batches of pdf_pages_per_task. Image-only pages of a
+    batch are collected first and OCR'd together (see _ocr_pdf_pages), then
+    the batch is yielded in page order. Each record names the backend
+    that produced its text.
+    """
+    name = file_path.name
+    own_handle = handle is None
+    handle = handle or _open_pdf(file_path, backends)
+    if handle is None:
+        logger.error(f"Could not extract PDF: {name}")
+        return
+    fallbacks = {}
+    batch_size = max(1, options["pdf_pages_per_task"])
+    try:
+        for batch_start in range(start, end, batch_size):
+            batch_end = min(batch_start + batch_size, end)
+            pages = [
+                (index + 1,) + _read_pdf_page(file_path, handle, fallbacks, backends, index)
+                for index in range(batch_start, batch_end)
+            ]
+
+            ocr_texts = {}
+            image_only = [page_num for page_num, text, _ in pages
+                          if text is not None and not text.strip()]
+            if image_only and _ocr_available():
+                ocr_texts = _ocr_pdf_pages(file_path, image_only, options, handle)
+
+            for page_num, text, backend in pages:
+                if page_num in ocr_texts:
+                    text, backend = ocr_texts[page_num], "ocr"
+                if not text:
+                    continue
+                section = _last_pdf_heading(text)
+                for record in _page_records(text, name, page_num, section):
+                    record["backend"] = backend
+                    yield record
+    finally:
+        if own_handle:
+            handle.close()
+        for fallback in fallbacks.values():
+            if fallback:
+                fallback.close()
+
+
+def _extract_pdf_range(file_path: Path, backends: List[str],
+                       start: int, end: int, options: Dict) -> List[Dict]:
+    """Process-pool task: extract one page range."""
+    return list(_iter_pdf_pages(file_path, backends, start, end, options))
+
+
+# ---------------------------------------------------------------------------
+# Batched OCR for image-only PDF pages
+# ---------------------------------------------------------------------------
+
+def _contiguous_runs(page_nums: List[int]) -> List[tuple]:
+    """[1, 2, 3, 7, 8] -> [(1, 3), (7, 8)]"""
+    runs = []
+    for page_num in sorted(page_nums):
+        if runs and page_num == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page_num)
+        else:
+            runs.append((page_num, page_num))
+    return runs
+
+
+def _rasterize_pdf_pages(file_path: Path, page_nums: List[int], dpi: int,
+                         handle: Optional[_PdfHandle] = None) -> Iterator[tuple]:
+    """
+    Render the given 1-based pages to grayscale images in one pass.
+    Uses the already-open PyMuPDF document when there is one; otherwise
+    pdf2image renders each run of consecutive pages with a single call.
+
+    Yields:
+        (page_num, PIL image)
+    """
+    if fitz and Image:
+        doc = handle.fitz_doc if handle else None
+        own_doc = doc is None
+        doc = doc or _fitz_open(file_path)
+        try:
+            for page_num in page_nums:
+                pix = doc[page_num - 1].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+                yield page_num, Image.frombytes("L", (pix.width, pix.height), pix.samples)
+        finally:
+            if own_doc:
+                doc.close()
+        return
+
+    for first, last in _contiguous_runs(page_nums):
+        if isinstance(file_path, ArchiveMember):
+            images = pdf2image.convert_from_bytes(file_path.read_bytes(), dpi=dpi,
+                                                  first_page=first, last_page=last,
+                                                  grayscale=True)
+        else:
+            images = pdf2image.convert_from_path(file_path, dpi=dpi, first_page=first,
+                                                 last_page=last, grayscale=True)
+        yield from zip(range(first, last + 1), images)
+
+
+def _ocr_cache_path(cache_dir: Optional[str], key: str) -> Optional[Path]:
+    return Path(cache_dir) / key[:2] / f"{key}.txt" if cache_dir else None
+
+
+def _ocr_pdf_pages(file_path: Path, page_nums: List[int], options: Dict,
+                   handle: Optional[_PdfHandle] = None) -> Dict[int, str]:
+    """
+    OCR image-only pages: rasterize them together at options["ocr_dpi"],
+    look each page image up in the OCR cache by content hash, and run
+    tesseract on the misses across options["ocr_workers"] threads
+    (tesseract runs as a subprocess, so threads parallelise fine).
+
+    Returns:
+        {page_num: ocr_text}
+    """
+    name = file_path.name
+    cache_dir = options["ocr_cache_dir"]
+    results = {}
+    todo = {}  # image hash -> (image, cache path, page numbers sharing it)
+    try:
+        for page_num, image in _rasterize_pdf_pages(file_path, page_nums,
+                                                    options["ocr_dpi"], handle):
+            digest = hashlib.sha256(image.tobytes())
+            digest.update(f"{image.mode}{image.size}".encode())
+            key = digest.hexdigest()
+            cache_path = _ocr_cache_path(cache_dir, key)
+            if key in todo:
+                todo[key][2].append(page_num)
+            elif cache_path and cache_path.exists():
+                results[page_num] = cache_path.read_text(encoding='utf-8')
+            else:
+                todo[key] = (image, cache_path, [page_num])
+    except Exception as e:
+        logger.error(f"Rasterizing {name} for OCR failed: {e}")
+
+    if todo:
+        logger.info(f"OCR {name}: {len(todo)} distinct page image(s), {len(results)} cached")
+        with ThreadPoolExecutor(max_workers=max(1, options["ocr_workers"])) as pool:
+            futures = [pool.submit(pytesseract.image_to_string, image)
+                       for image, _, _ in todo.values()]
+            for (_, cache_path, pages), future in zip(todo.values(), futures):
+                try:
+                    text = future.result()
+                except Exception as e:
+                    logger.error(f"OCR failed for {name} page(s) {pages}: {e}")
+                    continue
+                for page_num in pages:
+                    results[page_num] = text
+                if cache_path:
+                    try:
+                        cache_path.parent.mkdir(parents=True, exist_ok=True)
+                        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+                        tmp_path.write_text(text, encoding='utf-8')
+                        os.replace(tmp_path, cache_path)
+                    except OSError as e:
+                        logger.warning(f"Could not write OCR cache entry: {e}")
+    return results
+
+
+def _extract_pdf(file_path: Path, options: Dict) -> Iterator[Dict]:
+    name = file_path.name
+    backends = _pdf_backend_order(options["pdf_backend"])
+    if not backends:
+        logger.error("No PDF backend installed: pip install pymupdf")
+        return
+
+    # Open exactly once to pick the backend and count pages
+    handle = _open_pdf(file_path, backends)
+    if handle is None:
+        logger.error(f"Could not extract PDF: {name}")
+        return
+    backends.remove(handle.backend)
+    backends.insert(0, handle.backend)
+
+    page_count = handle.page_count
+    workers = options["pdf_page_workers"]
+    per_task = max(1, options["pdf_pages_per_task"])
+    if workers <= 1 or page_count <= per_task:
+        try:
+            yield from _iter_pdf_pages(file_path, backends, 0, page_count, options, handle)
+        finally:
+            handle.close()
+        return
+
+    handle.close()
+    ranges = [(s, min(s + per_task, page_count)) for s in range(0, page_count, per_task)]
+    logger.info(f"Extracting {name}: {page_count} pages in {len(ranges)} ranges "
+                f"on {workers} workers ({backends[0]})")
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        tasks = ((file_path, backends, s, e, options) for s, e in ranges)
+        for records in _ordered_map(pool, _extract_pdf_range, tasks, window=2 * workers):
+            yield from records
+
+
+def _ordered_map(pool, fn, arg_tuples, window: int):
+    """
+    Like pool.map, but keeps at most `window` tasks in flight so results
+    are never buffered far ahead of the consumer. Yields in input order.
+    """
+    arg_tuples = iter(arg_tuples)
+    pending = [pool.submit(fn, *args) for args in islice(arg_tuples, window)]
+    while pending:
+        result = pending.pop(0).result()
+        for args in islice(arg_tuples, 1):
+            pending.append(pool.submit(fn, *args))
+        yield result
+
+
+# WordprocessingML / DrawingML / PresentationML namespaces
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+DOCX_RECORD_CHARS = 8000  # paragraphs of one section are merged up to this size
+
+
+def _docx_style_names(zf: zipfile.ZipFile) -> Dict[str, str]:
+    """Map paragraph styleId -> style name from word/styles.xml."""
+    try:
+        root = ElementTree.fromstring(zf.read("word/styles.xml"))
+    except KeyError:
+        return {}
+    names = {}
+    for style in root.iter(f"{_W}style"):
+        name = style.find(f"{_W}name")
+        if name is not None:
+            names[style.get(f"{_W}styleId")] = name.get(f"{_W}val", "")
+    return names
+
+
+def _docx_paragraph_text(paragraph) -> str:
+    parts = []
+    for el in paragraph.iter():
+        if el.tag == f"{_W}t" and el.text:
+            parts.append(el.text)
+        elif el.tag == f"{_W}tab":
+            parts.append("\t")
+        elif el.tag in (f"{_W}br", f"{_W}cr"):
+            parts.append("\n")
+    return "".join(parts)
+
+
+def _docx_table_rows(table) -> Iterator[List[str]]:
+    for row in table.findall(f"{_W}tr"):
+        yield ["\n".join(_docx_paragraph_text(p) for p in cell.iter(f"{_W}p")).strip()
+               for cell in row.findall(f"{_W}tc")]
+
+
+def _extract_docx(file_path: Path, options: Dict) -> Iterator[Dict]:
+    """
+    Stream word/document.xml straight from the zip with iterparse.
+
+    Body-level paragraphs and tables are handled as their closing tag is
+    parsed and then dropped from the tree, so memory stays flat however
+    long the document is. Consecutive paragraphs of one section are
+    merged into a record (page = index of its first paragraph); heading
+    styles start a new section, and each table becomes header-aware row
+    groups like CSV/XLSX.
+    """
     name = file_path.name
-    if not DocxDocument:
-        logger.error("python-docx not installed")
-        return chunks
     try:
-        doc = DocxDocument(file_path)
-        section = None
-        for i, para in enumerate(doc.paragraphs, start=1):
-            h = _detect_heading_docx(para)
-            if h:
-                section = h
-            if para.text.strip():
-                chunks.extend(_chunk_text(para.text, name, i, section))
-        # Extract tables
-        for table_num, table in enumerate(doc.tables, start=1):
-            for row_num, row in enumerate(table.rows, start=1):
-                row_text = " | ".join(
-                    cell.text.strip() for cell in row.cells if cell.text.strip()
-                )
-                if row_text:
-                    chunks.extend(_chunk_text(row_text, f"{name}:Table{table_num}", row_num))
+        with zipfile.ZipFile(_binary_source(file_path)) as zf:
+            styles = _docx_style_names(zf)
+            section = None
+            buffer, buffer_start, buffer_chars = [], 1, 0
+            para_num = 0
+            table_num = 0
+            depth = 0
+            body = None
+            with zf.open("word/document.xml") as xml:
+                for event, el in ElementTree.iterparse(xml, events=("start", "end")):
+                    if event == "start":
+                        depth += 1
+                        if el.tag == f"{_W}body":
+                            body = el
+                        continue
+                    depth -= 1
+                    # Only body-level elements (document > body > element)
+                    if depth != 2 or body is None:
+                        continue
+
+                    if el.tag == f"{_W}p":
+                        para_num += 1
+                        text = _docx_paragraph_text(el)
+                        style = el.find(f"{_W}pPr/{_W}pStyle")
+                        style_name = styles.get(style.get(f"{_W}val")) if style is not None else None
+                        heading = _detect_heading_docx(style_name, text)
+                        if heading or buffer_chars >= DOCX_RECORD_CHARS:
+                            yield from _page_records("\n".join(buffer), name, buffer_start, section)
+                            buffer, buffer_chars = [], 0
+                        if heading:
+                            section = heading
+                        if text.strip():
+                            if not buffer:
+                                buffer_start = para_num
+                            buffer.append(text)
+                            buffer_chars += len(text)
+
+                    elif el.tag == f"{_W}tbl":
+                        yield from _page_records("\n".join(buffer), name, buffer_start, section)
+                        buffer, buffer_chars = [], 0
+                        table_num += 1
+                        for record in _iter_row_groups(_docx_table_rows(el), name,
+                                                       options["table_rows_per_chunk"],
+                                                       section=section):
+                            record["source"] = f"{name}:Table{table_num}"
+                            record["page"] = para_num + 1
+                            yield record
+
+                    body.remove(el)
+            yield from _page_records("\n".join(buffer), name, buffer_start, section)
     except Exception as e:
         logger.error(f"DOCX extraction failed for {name}: {e}")
-    return chunks
 
 
-def _extract_xlsx(file_path: Path) -> List[Dict]:
-    chunks = []
+def _row_text(row) -> str:
+    """Render a table row; empty cells are kept so columns line up with the header."""
+    cells = ["" if cell is None else str(cell).strip() for cell in row]
+    while cells and not cells[-1]:
+        cells.pop()
+    return " | ".join(cells)
+
+
+def _iter_row_groups(rows, name: str, rows_per_chunk: int,
+                     section: Optional[str] = None, header: Optional[str] = None,
+                     first_row_num: int = 1, first_group: int = 1) -> Iterator[Dict]:
+    """
+    Group table rows into records of rows_per_chunk rows each.
+    The first non-empty row is treated as the column header and repeated
+    at the top of every group, so each record is self-describing. Only
+    the current group is held in memory.
+
+    To continue a table (e.g. rows appended to a CSV), pass the known
+    header and the row/group numbers to resume from.
+    """
+    rows_per_chunk = max(1, rows_per_chunk)
+    group = []
+    group_num = first_group
+    first_row = 0
+    for row_num, row in enumerate(rows, start=first_row_num):
+        row_text = _row_text(row)
+        if not row_text.strip(" |"):
+            continue
+        if header is None:
+            header = row_text
+            continue
+        if not group:
+            first_row = row_num
+        group.append(row_text)
+        if len(group) >= rows_per_chunk:
+            yield _table_record(name, group_num, section, header, group, first_row, row_num)
+            group_num += 1
+            group = []
+    if group:
+        yield _table_record(name, group_num, section, header, group, first_row, row_num)
+    elif header is not None and group_num == 1 and first_row_num == 1:
+        # Header-only table: keep it rather than drop the content entirely
+        yield _table_record(name, group_num, section, None, [header], 1, 1)
+
+
+def _table_record(name: str, group_num: int, section: Optional[str],
+                  header: Optional[str], rows: List[str],
+                  first_row: int, last_row: int) -> Dict:
+    lines = [header] + rows if header else rows
+    return {
+        "source": name,
+        "page": group_num,
+        "section": section,
+        "text": "\n".join(lines),
+        "rows": [first_row, last_row],
+    }
+
+
+def _extract_xlsx(file_path: Path, options: Dict) -> Iterator[Dict]:
     name = file_path.name
     if not openpyxl:
         logger.error("openpyxl not installed")
-        return chunks
+        return
     try:
-        wb = openpyxl.load_workbook(file_path, data_only=True)
-        for sheet_name in wb.sheetnames:
-            sheet = wb[sheet_name]
-            # Group rows in batches of 20 so related data stays together
-            row_buffer = []
-            chunk_num = 1
-            for row in sheet.iter_rows(values_only=True):
-                row_text = " | ".join(str(cell) for cell in row if cell is not None)
-                if row_text.strip():
-                    row_buffer.append(row_text)
-                if len(row_buffer) >= 20:
-                    combined = " \n ".join(row_buffer)
-                    chunks.extend(_chunk_text(combined, name, chunk_num, section=sheet_name))
-                    chunk_num += 1
-                    row_buffer = []
-            # Flush any remaining rows
-            if row_buffer:
-                combined = " \n ".join(row_buffer)
-                chunks.extend(_chunk_text(combined, name, chunk_num, section=sheet_name))
+        # Read-only mode streams rows from the sheet XML instead of
+        # building every cell object up front
+        wb = openpyxl.load_workbook(_binary_source(file_path), read_only=True, data_only=True)
+        try:
+            for sheet_name in wb.sheetnames:
+                rows = wb[sheet_name].iter_rows(values_only=True)
+                yield from _iter_row_groups(rows, name, options["table_rows_per_chunk"],
+                                            section=sheet_name)
+        finally:
+            wb.close()
     except Exception as e:
         logger.error(f"XLSX extraction failed for {name}: {e}")
-    return chunks
 
 
-def _extract_csv(file_path: Path) -> List[Dict]:
-    chunks = []
+def _extract_csv(file_path: Path, options: Dict) -> Iterator[Dict]:
     name = file_path.name
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        with file_path.open('r', encoding='utf-8', errors='ignore', newline='') as f:
             reader = csv.reader(f)
-            for row_num, row in enumerate(reader, start=1):
-                row_text = " | ".join(str(cell) for cell in row if cell)
-                if row_text.strip():
-                    chunks.extend(_chunk_text(row_text, name, row_num))
+            yield from _iter_row_groups(reader, name, options["table_rows_per_chunk"])
     except Exception as e:
         logger.error(f"CSV extraction failed for {name}: {e}")
-    return chunks
 
 
-def _extract_pptx(file_path: Path) -> List[Dict]:
-    chunks = []
+def _pptx_slide_parts(zf: zipfile.ZipFile) -> List[str]:
+    """Slide part names in presentation order (sldIdLst), not file-name order."""
+    rels = ElementTree.fromstring(zf.read("ppt/_rels/presentation.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{_PKG_REL}Relationship")}
+    presentation = ElementTree.fromstring(zf.read("ppt/presentation.xml"))
+    parts = []
+    for slide_id in presentation.iter(f"{_P}sldId"):
+        target = targets.get(slide_id.get(f"{_R}id"), "")
+        if target:
+            target = target.lstrip("/")
+            parts.append(target if target.startswith("ppt/") else f"ppt/{target}")
+    return parts
+
+
+def _extract_pptx(file_path: Path, options: Dict) -> Iterator[Dict]:
+    """Read each slide's XML part with iterparse; one record per slide."""
     name = file_path.name
-    if not Presentation:
-        logger.error("python-pptx not installed")
-        return chunks
     try:
-        prs = Presentation(file_path)
-        for slide_num, slide in enumerate(prs.slides, start=1):
-            slide_text = []
-            for shape in slide.shapes:
-                if hasattr(shape, "text") and shape.text.strip():
-                    slide_text.append(shape.text.strip())
-            if slide_text:
-                combined = " ".join(slide_text)
-                chunks.extend(_chunk_text(combined, name, slide_num))
+        with zipfile.ZipFile(_binary_source(file_path)) as zf:
+            for slide_num, part in enumerate(_pptx_slide_parts(zf), start=1):
+                lines = []
+                with zf.open(part) as xml:
+                    for _, el in ElementTree.iterparse(xml):
+                        if el.tag == f"{_A}p":
+                            text = "".join(t.text or "" for t in el.iter(f"{_A}t"))
+                            if text.strip():
+                                lines.append(text.strip())
+                            el.clear()
+                yield from _page_records("\n".join(lines), name, slide_num)
     except Exception as e:
         logger.error(f"PPTX extraction failed for {name}: {e}")
-    return chunks
 
 
-def _extract_html(file_path: Path) -> List[Dict]:
-    chunks = []
+# Elements whose content is page furniture rather than document text
+_HTML_SKIP_TAGS = {
+    "script", "style", "noscript", "template", "nav", "header", "footer",
+    "aside", "form", "button", "iframe", "svg", "canvas", "head",
+}
+_HTML_HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+_HTML_BLOCK_TAGS = {
+    "p", "div", "br", "li", "tr", "td", "th", "section", "article",
+    "blockquote", "pre", "dd", "dt", "table", "ul", "ol",
+}
+
+
+def _html_sections_lxml(content: bytes) -> Iterator[tuple]:
+    """
+    Parse HTML with lxml (C parser) and walk the tree once, iteratively.
+    Boilerplate subtrees are skipped and each h1-h6 starts a new section.
+
+    Yields:
+        (section heading or None, section text)
+    """
+    try:
+        root = lxml_html.document_fromstring(content)
+    except Exception:  # lxml raises on empty/whitespace-only documents
+        return
+    section = None
+    parts = []
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        tag = item.tag.lower() if isinstance(item.tag, str) else None
+        if item.tail:
+            stack.append(item.tail)
+        if tag is None or tag in _HTML_SKIP_TAGS:  # comments, PIs, boilerplate
+            continue
+        if tag in _HTML_HEADING_TAGS:
+            text = "".join(parts).strip()
+            if text:
+                yield section, text
+            # An empty heading still ends the section before it: what
+            # follows gets no heading rather than the previous one
+            section = " ".join(item.text_content().split()) or None
+            parts = [section, "\n"] if section else []
+            continue
+        if tag in _HTML_BLOCK_TAGS:
+            stack.append("\n")
+        stack.extend(reversed(item))
+        if item.text:
+            parts.append(item.text)
+    text = "".join(parts).strip()
+    if text:
+        yield section, text
+
+
+def _html_sections_fallback(content: bytes) -> Iterator[tuple]:
+    """BeautifulSoup (or regex) fallback: whole document as one section."""
+    content = content.decode('utf-8', errors='ignore')
+    if bs4:
+        soup = bs4.BeautifulSoup(content, 'html.parser')
+        for tag in soup(list(_HTML_SKIP_TAGS)):
+            tag.decompose()
+        text = soup.get_text(separator=' ')
+    else:
+        # Strip tags with regex if BeautifulSoup not available
+        text = re.sub(r'<[^>]+>', ' ', content)
+    yield None, text
+
+
+def _html_sections(content: bytes, parser: str) -> Iterator[tuple]:
+    if lxml_html and parser in ("auto", "lxml"):
+        return _html_sections_lxml(content)
+    return _html_sections_fallback(content)
+
+
+def _extract_html(file_path: Path, options: Dict) -> Iterator[Dict]:
     name = file_path.name
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        if BeautifulSoup:
-            soup = BeautifulSoup(content, 'html.parser')
-            text = soup.get_text(separator=' ')
-        else:
-            # Strip tags with regex if BeautifulSoup not available
-            text = re.sub(r'<[^>]+>', ' ', content)
-        chunks.extend(_chunk_text(text, name, 1))
+        content = file_path.read_bytes()
+        for section, text in _html_sections(content, options["html_parser"]):
+            yield from _page_records(text, name, 1, section)
     except Exception as e:
         logger.error(f"HTML extraction failed for {name}: {e}")
-    return chunks
 
 
-def _extract_epub(file_path: Path) -> List[Dict]:
-    chunks = []
+def _read_epub(file_path: Path):
+    if not isinstance(file_path, ArchiveMember):
+        return epub.read_epub(str(file_path))
+    # ebooklib only opens paths, so an archive member is spooled to a
+    # temporary file for the duration of the parse
+    with tempfile.NamedTemporaryFile(suffix=".epub") as tmp:
+        tmp.write(file_path.read_bytes())
+        tmp.flush()
+        return epub.read_epub(tmp.name)
+
+
+def _extract_epub(file_path: Path, options: Dict) -> Iterator[Dict]:
     name = file_path.name
     if not ebooklib:
         logger.error("ebooklib not installed: pip install EbookLib")
-        return chunks
+        return
     try:
-        book = epub.read_epub(str(file_path))
+        book = _read_epub(file_path)
         page_num = 1
         for item in book.get_items():
             if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                content = item.get_content().decode('utf-8', errors='ignore')
-                if BeautifulSoup:
-                    soup = BeautifulSoup(content, 'html.parser')
-                    text = soup.get_text(separator=' ')
-                else:
-                    text = re.sub(r'<[^>]+>', ' ', content)
-                chunks.extend(_chunk_text(text, name, page_num))
+                for section, text in _html_sections(item.get_content(), options["html_parser"]):
+                    yield from _page_records(text, name, page_num, section)
                 page_num += 1
     except Exception as e:
         logger.error(f"EPUB extraction failed for {name}: {e}")
-    return chunks
 
 
-def _extract_rtf(file_path: Path) -> List[Dict]:
-    chunks = []
+def _extract_rtf(file_path: Path, options: Dict) -> Iterator[Dict]:
     name = file_path.name
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        with file_path.open('r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
         if striprtf_module:
             text = striprtf_module.rtf_to_text(content)
@@ -323,23 +837,77 @@ def _extract_rtf(file_path: Path) -> List[Dict]:
             # Rough RTF stripping
             text = re.sub(r'\\[a-z]+\d* ?', ' ', content)
             text = re.sub(r'[{}]', '', text)
-        chunks.extend(_chunk_text(text, name, 1))
+        yield from _page_records(text, name, 1)
     except Exception as e:
         logger.error(f"RTF extraction failed for {name}: {e}")
-    return chunks
 
 
-def _extract_text(file_path: Path) -> List[Dict]:
+def _extract_text(file_path: Path, options: Dict) -> Iterator[Dict]:
     """Generic extractor for plain text, code, markdown, JSON, YAML, etc."""
-    chunks = []
     name = file_path.name
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            text = f.read()
-        chunks.extend(_chunk_text(text, name, 1))
+        if file_path.stat().st_size > options["text_stream_threshold"]:
+            yield from _stream_large_text(file_path, options["text_block_bytes"])
+            return
+        data = file_path.read_bytes()
+        encoding, bom = _bom_encoding(data)
+        yield from _page_records(data[bom:].decode(encoding, errors='ignore'), name, 1)
     except Exception as e:
         logger.error(f"Text extraction failed for {name}: {e}")
-    return chunks
+
+
+def _stream_large_text(file_path: Path, block_bytes: int) -> Iterator[Dict]:
+    """
+    Memory-map a large text file and decode it block by block.
+
+    Each block ends at the last paragraph break (blank line) inside the
+    block window, else the last line break, else at the window edge; an
+    incremental decoder carries any multi-byte character split by a hard
+    cut over to the next block. Block n is reported as page n.
+    """
+    name = file_path.name
+    if isinstance(file_path, ArchiveMember):
+        # Already in memory; decode straight from the member's bytes
+        yield from _decode_blocks(file_path.read_bytes(), name, block_bytes)
+        return
+    with open(file_path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield from _decode_blocks(mm, name, block_bytes)
+
+
+def _bom_encoding(head: bytes) -> Tuple[str, int]:
+    """(codec, BOM length) for text starting with head; UTF-8 if it has no BOM."""
+    for bom, encoding in _TEXT_BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom)
+    return 'utf-8', 0
+
+
+def _decode_blocks(buf, name: str, block_bytes: int, start: int = 0,
+                   size: Optional[int] = None, block_num: int = 1) -> Iterator[Dict]:
+    """
+    Decode buf[start:size] (mmap or bytes holding the whole file) block by
+    block, numbering from block_num. The codec comes from the BOM at
+    offset 0, so appended tails decode like the rest of the file.
+    """
+    block_bytes = max(1, block_bytes)
+    encoding, bom = _bom_encoding(bytes(buf[:4]))
+    decoder = codecs.getincrementaldecoder(encoding)(errors='ignore')
+    paragraph_break, line_break = "\n\n".encode(encoding), "\n".encode(encoding)
+    start = max(start, bom)
+    size = len(buf) if size is None else size
+    while start < size:
+        end = min(start + block_bytes, size)
+        if end < size:
+            cut = buf.rfind(paragraph_break, start, end)
+            if cut < 0:
+                cut = buf.rfind(line_break, start, end)
+            if cut >= 0:
+                end = cut + len(line_break)
+        text = decoder.decode(buf[start:end], final=(end >= size))
+        yield from _page_records(text, name, block_num)
+        block_num += 1
+        start = end
 
 
 # ---------------------------------------------------------------------------
@@ -375,15 +943,630 @@ FORMAT_HANDLERS = {
 }
 
 
-def _extract_file(file_path: Path) -> List[Dict]:
+# ---------------------------------------------------------------------------
+# Appended tails — CSV/text files that only ever grow
+# ---------------------------------------------------------------------------
+
+APPENDABLE_SUFFIXES = {'.csv', '.log', '.txt', '.jsonl', '.ndjson'}
+APPEND_SETTLE_SECONDS = 60  # a final line without a line break counts as complete once the file is this quiet
+
+
+def _complete_lines_end(buf, start: int, end: Optional[int] = None) -> int:
+    """Offset just past the last line break in buf[start:end] (start if none)."""
+    cut = buf.rfind(b"\n", start, len(buf) if end is None else end)
+    return cut + 1 if cut >= 0 else start
+
+
+def _ingestable_end(buf, start: int, size: int, mtime: float) -> int:
+    """
+    How much of buf[start:size] to ingest from a file that may still be
+    written: up to the last complete line, or all of it once the file
+    has not changed for APPEND_SETTLE_SECONDS (a finished file whose last
+    line has no line break, rather than a line still being written).
+    """
+    if time.time() - mtime >= APPEND_SETTLE_SECONDS:
+        return size
+    return _complete_lines_end(buf, start, size)
+
+
+def _iter_buffer_lines(buf, start: int, end: int) -> Iterator[str]:
+    """Decode buf[start:end] (UTF-8) line by line, without copying it whole."""
+    while start < end:
+        cut = buf.find(b"\n", start, end)
+        stop = end if cut < 0 else cut + 1
+        yield bytes(buf[start:stop]).decode('utf-8', errors='ignore')
+        start = stop
+
+
+def _iter_prefix(file_path: Path, end: int, options: Dict) -> Iterator[Dict]:
+    """Records for the first `end` bytes of an appendable file, read as a tail from 0."""
+    if end <= 0:
+        return
+    with open(file_path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield from _iter_tail(file_path, mm, 0, min(end, len(mm)), {}, options)
+
+
+def read_csv_header(file_path: Path) -> Optional[str]:
+    """A CSV's header row as tables render it (the first non-empty row), or None."""
+    with open(file_path, 'r', encoding='utf-8-sig', errors='ignore', newline='') as f:
+        for row in csv.reader(f):
+            row_text = _row_text(row)
+            if row_text.strip(" |"):
+                return row_text
+    return None
+
+
+def _iter_tail(file_path: Path, buf, start: int, end: int,
+               state: Dict, options: Dict) -> Iterator[Dict]:
+    """
+    Records for bytes [start, end) appended to a file, numbered to follow
+    on from what was ingested before (state: next_page, and for CSV the
+    header and next_row).
+    """
+    name = file_path.name
+    if file_path.suffix.lower() == '.csv':
+        if start == 0:
+            start = _bom_encoding(bytes(buf[:4]))[1]
+        yield from _iter_row_groups(
+            csv.reader(_iter_buffer_lines(buf, start, end)), name,
+            options["table_rows_per_chunk"], header=state.get("header"),
+            first_row_num=state.get("next_row", 1), first_group=state.get("next_page", 1),
+        )
+        return
+    yield from _decode_blocks(buf, name, options["text_block_bytes"], start, end,
+                              block_num=state.get("next_page", 1))
+
+
+# ---------------------------------------------------------------------------
+# Content sniffing — route by magic bytes, not just by extension
+# ---------------------------------------------------------------------------
+
+SNIFF_BYTES = 8192  # bytes read from the start of a file to detect its type
+
+# Leading bytes -> detected type (checked in order)
+_MAGIC_NUMBERS = [
+    (b"%PDF-", "pdf"),
+    (b"PK\x03\x04", "zip"),
+    (b"PK\x05\x06", "zip"),  # empty zip
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),  # legacy .doc/.xls/.ppt
+    (b"{\\rtf", "rtf"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bzip2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"7z\xbc\xaf\x27\x1c", "7z"),
+    (b"Rar!\x1a\x07", "rar"),
+    (b"\x7fELF", "elf"),
+    (b"SQLite format 3\x00", "sqlite"),
+]
+
+# Zip-based containers, recognized by a part only they contain
+_ZIP_MARKERS = [
+    ("word/document.xml", "docx"),
+    ("xl/workbook.xml", "xlsx"),
+    ("ppt/presentation.xml", "pptx"),
+]
+
+# Detected type -> extractor; these win over whatever the extension says
+SNIFFED_HANDLERS = {
+    "pdf": _extract_pdf,
+    "docx": _extract_docx,
+    "xlsx": _extract_xlsx,
+    "pptx": _extract_pptx,
+    "epub": _extract_epub,
+    "rtf": _extract_rtf,
+}
+
+_UTF16_BOMS = (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+# Byte-order marks -> codec that decodes what follows them
+_TEXT_BOMS = [
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+]
+# Control bytes that never appear in text (everything below 0x20 except \t \n \f \r, ESC)
+_BINARY_BYTES = bytes(set(range(32)) - {8, 9, 10, 12, 13, 27})
+
+
+class UnsupportedFormatError(ValueError):
+    """Raised when a file's content is binary data no extractor can read."""
+
+
+def _sniff_zip(file_path: Path) -> str:
+    try:
+        with zipfile.ZipFile(_binary_source(file_path)) as zf:
+            names = set(zf.namelist())
+            if "mimetype" in names and zf.read("mimetype").strip() == b"application/epub+zip":
+                return "epub"
+    except (zipfile.BadZipFile, OSError, KeyError):
+        return "binary"
+    for marker, detected in _ZIP_MARKERS:
+        if marker in names:
+            return detected
+    return "zip"
+
+
+def _sniff_format(file_path: Path) -> str:
+    """
+    Detect a file's type from its content.
+
+    Checks magic numbers first, looks inside zip containers for the part
+    that identifies DOCX/XLSX/PPTX/EPUB, and otherwise decides between
+    text and binary from the first SNIFF_BYTES bytes.
+
+    Returns:
+        A type from _MAGIC_NUMBERS / _ZIP_MARKERS, "epub", "text", "empty"
+        or "binary"
+    """
+    with file_path.open('rb') as f:
+        head = f.read(SNIFF_BYTES)
+    if not head:
+        return "empty"
+    for magic, detected in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return _sniff_zip(file_path) if detected == "zip" else detected
+    if head.startswith(_UTF16_BOMS):
+        return "text"
+    if b"\x00" in head:
+        return "binary"
+    # A few stray control bytes are tolerated (odd exports); many mean binary
+    if len(head.translate(None, _BINARY_BYTES)) < 0.9 * len(head):
+        return "binary"
+    return "text"
+
+
+def _iter_file(file_path: Path, options: Optional[Dict] = None,
+               detected: Optional[str] = None, limit: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Stream raw page/section records from a file.
+
+    The file's content decides the extractor when it is a recognized
+    document type (a PDF named .txt is still parsed as a PDF); text files
+    are routed by extension. Binary content nothing can read (images,
+    legacy OLE Office files, executables, compressed streams) raises
+    UnsupportedFormatError instead of being read as garbage text.
+    `detected` is the file's _sniff_format result, if the caller has it.
+    With a `limit`, a CSV/text file in APPENDABLE_SUFFIXES is read only up
+    to that offset (see DocumentLoader.ingestable_bytes).
+    """
+    options = {**DEFAULT_OPTIONS, **(options or {})}
     suffix = file_path.suffix.lower()
-    if suffix in FORMAT_HANDLERS:
-        return FORMAT_HANDLERS[suffix](file_path)
-    if suffix in TEXT_EXTENSIONS:
-        return _extract_text(file_path)
-    # Last resort — try reading as text anyway
-    logger.warning(f"Unknown type {suffix} for {file_path.name}, attempting raw text read")
-    return _extract_text(file_path)
+    detected = detected or _sniff_format(file_path)
+    if detected in SNIFFED_HANDLERS:
+        return SNIFFED_HANDLERS[detected](file_path, options)
+    if detected not in ("text", "empty"):
+        hint = " (legacy Office format, save as .docx/.xlsx/.pptx)" if detected == "ole" else ""
+        raise UnsupportedFormatError(f"unsupported {detected} content{hint}")
+    if limit is not None and suffix in APPENDABLE_SUFFIXES:
+        return _iter_prefix(file_path, limit, options)
+    handler = FORMAT_HANDLERS.get(suffix)
+    if handler in (_extract_csv, _extract_html):
+        return handler(file_path, options)
+    if handler is not None:
+        logger.warning(f"{file_path.name} has a {suffix} extension but text content, reading as text")
+    elif suffix not in TEXT_EXTENSIONS:
+        logger.warning(f"Unknown type {suffix} for {file_path.name}, content looks like text")
+    return _extract_text(file_path, options)
+
+
+def _extract_file(file_path: Path, options: Optional[Dict] = None,
+                  detected: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+    return list(_iter_file(file_path, options, detected, limit))
+
+
+def _try_sniff_format(file_path: Path) -> Optional[str]:
+    """_sniff_format, or None if the file can't be read (extraction reports why)."""
+    try:
+        return _sniff_format(file_path)
+    except OSError:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Archives — members are streamed into the extractors without unpacking
+# ---------------------------------------------------------------------------
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+def _is_archive(path) -> bool:
+    return path.name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+class ArchiveMember:
+    """
+    One file inside a zip/tar archive, held in memory.
+
+    Offers the parts of the Path interface the extractors use (name, stem,
+    suffix, open, read_bytes, stat), so a member can go through
+    FORMAT_HANDLERS, the extraction cache and the worker processes exactly
+    like a file on disk. name is "<archive name>/<member path>", which
+    makes record sources and doc_ids point at the member.
+    """
+
+    def __init__(self, archive_name: str, member_path: str, data: bytes, mtime: float):
+        self.member_path = member_path
+        self.name = f"{archive_name}/{member_path}"
+        self.suffix = posixpath.splitext(posixpath.basename(member_path))[1]
+        self.stem = self.name[:len(self.name) - len(self.suffix)]
+        self._data = data
+        self._mtime = mtime
+
+    def open(self, mode: str = 'r', encoding: Optional[str] = None,
+             errors: Optional[str] = None, newline: Optional[str] = None):
+        stream = io.BytesIO(self._data)
+        if 'b' in mode:
+            return stream
+        return io.TextIOWrapper(stream, encoding=encoding or 'utf-8',
+                                errors=errors, newline=newline)
+
+    def read_bytes(self) -> bytes:
+        return self._data
+
+    def stat(self) -> os.stat_result:
+        return os.stat_result((0o100644, 0, 0, 1, 0, 0, len(self._data),
+                               self._mtime, self._mtime, self._mtime))
+
+    def __repr__(self) -> str:
+        return f"ArchiveMember({self.name!r}, {len(self._data)} bytes)"
+
+
+def count_archive_members(archive_path: Path) -> Optional[int]:
+    """
+    Check that an archive is readable and count its regular files, without
+    extracting anything.
+
+    A zip is counted from its central directory. A tar has no index, so
+    counting would mean decompressing the whole stream; only its first
+    header is read and None is returned.
+    Raises zipfile.BadZipFile / tarfile.TarError if the archive is unreadable.
+    """
+    archive_path = Path(archive_path)
+    if archive_path.name.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive_path) as zf:
+            return sum(1 for info in zf.infolist() if not info.is_dir())
+    with tarfile.open(archive_path, mode='r|*') as tf:
+        tf.next()
+    return None
+
+
+def _binary_source(file_path: Path):
+    """What zipfile/openpyxl should open: the path, or a member's bytes."""
+    return file_path.open('rb') if isinstance(file_path, ArchiveMember) else file_path
+
+
+def _normalize_member_path(member_path: str) -> str:
+    """Strip "./" and leading slashes so ids don't depend on how the archive was built."""
+    return posixpath.normpath(member_path).lstrip('/')
+
+
+def _member_skip_reason(member_path: str) -> Optional[str]:
+    base = posixpath.basename(member_path)
+    if base.startswith('.') or member_path.startswith('__MACOSX/'):
+        return "hidden file"
+    if _is_archive(Path(base)):
+        return "nested archive"
+    return None
+
+
+def _iter_archive_members(archive_path: Path, max_member_bytes: Optional[int],
+                          archive_name: Optional[str] = None) -> Iterator[tuple]:
+    """
+    Stream the regular files of a zip or tar archive in archive order.
+
+    Nothing is written to disk: each member is read into memory only when
+    the consumer asks for it. Tar archives are opened in stream mode, so
+    a compressed tar is decompressed once front to back. Hidden entries
+    and nested archives are skipped; members whose uncompressed size
+    exceeds max_member_bytes are reported instead of read (zip bombs).
+
+    Yields:
+        (display name, ArchiveMember | None, reason the member was refused | None)
+    """
+    archive_name = archive_name or archive_path.name
+    if archive_path.name.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                member_path = _normalize_member_path(info.filename)
+                skip = _member_skip_reason(member_path)
+                if skip:
+                    logger.debug(f"Skipping {archive_name}/{member_path}: {skip}")
+                    continue
+                display = f"{archive_name}/{member_path}"
+                if max_member_bytes and info.file_size > max_member_bytes:
+                    yield display, None, f"{info.file_size} bytes uncompressed exceeds member limit"
+                    continue
+                # ZipExtFile stops at the declared size, so a lying header
+                # cannot inflate past the limit checked above
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                yield display, ArchiveMember(archive_name, member_path,
+                                             zf.read(info), mtime), None
+        return
+
+    with tarfile.open(archive_path, mode='r|*') as tf:
+        for info in tf:
+            if not info.isfile():
+                continue
+            member_path = _normalize_member_path(info.name)
+            skip = _member_skip_reason(member_path)
+            if skip:
+                logger.debug(f"Skipping {archive_name}/{member_path}: {skip}")
+                continue
+            display = f"{archive_name}/{member_path}"
+            if max_member_bytes and info.size > max_member_bytes:
+                yield display, None, f"{info.size} bytes exceeds member limit"
+                continue
+            data = tf.extractfile(info).read()
+            yield display, ArchiveMember(archive_name, member_path, data, info.mtime), None
+
+
+# ---------------------------------------------------------------------------
+# Directory scanning — one os.scandir pass, one stat per file
+# ---------------------------------------------------------------------------
+
+def _matches(rel_path: str, patterns) -> bool:
+    """Glob match against the relative path, or the bare name for patterns without '/'."""
+    name = rel_path.rsplit('/', 1)[-1]
+    return any(fnmatch.fnmatch(rel_path if '/' in pattern else name, pattern)
+               for pattern in patterns)
+
+
+def scan_directory(directory: Path, include: Optional[List[str]] = None,
+                   exclude: Optional[List[str]] = None,
+                   max_depth: Optional[int] = None) -> List[tuple]:
+    """
+    Walk a directory tree in a single os.scandir pass.
+
+    Hidden entries are skipped and directory symlinks are not followed.
+    Files are stat'ed exactly once; the result travels with the path so
+    later stages (file size, doc_id) never stat again.
+
+    Args:
+        directory: Root to walk
+        include: Glob patterns a file must match (all files if None)
+        exclude: Glob patterns that drop a file or prune a whole directory
+        max_depth: Directory levels to descend (0 = only the root's own
+                   files, None = unlimited)
+
+    Returns:
+        [(path, os.stat_result)] sorted by path relative to the root
+    """
+    exclude = exclude or []
+    found = []
+    stack = [(Path(directory), "", 0)]
+    while stack:
+        path, rel_dir, depth = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.warning(f"Cannot scan {path}: {e}")
+            continue
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            rel_path = f"{rel_dir}{entry.name}"
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if (max_depth is None or depth < max_depth) and not _matches(rel_path, exclude):
+                        stack.append((Path(entry.path), f"{rel_path}/", depth + 1))
+                    continue
+                if not entry.is_file():
+                    continue
+                if include and not _matches(rel_path, include):
+                    continue
+                if _matches(rel_path, exclude):
+                    continue
+                found.append((rel_path, Path(entry.path), entry.stat()))
+            except OSError as e:
+                logger.warning(f"Cannot stat {entry.path}: {e}")
+    found.sort(key=lambda item: item[0])
+    return [(path, st) for _, path, st in found]
+
+
+# ---------------------------------------------------------------------------
+# Boilerplate — running headers/footers learned per document
+# ---------------------------------------------------------------------------
+
+BOILERPLATE_EDGE_LINES = 3    # non-blank lines at the top and bottom of a page that may be boilerplate
+                              # (fewer on short pages, so each page keeps at least one body line)
+BOILERPLATE_MIN_PAGES = 3     # a line must repeat on at least this many pages...
+BOILERPLATE_PAGE_RATIO = 0.5  # ...and on at least this share of the document's pages
+# Only these have real pages with running headers/footers; the records of
+# other formats (text/log blocks, DOCX paragraph groups, HTML/EPUB sections)
+# are not pages, and their edge lines are content
+BOILERPLATE_FORMATS = {"pdf", "pptx"}
+
+_DIGITS_RE = re.compile(r'\d+')
+_SPACE_RE = re.compile(r'\s+')
+# Page numbers: "Page 3", "page 3 of 40", "3 / 40", or a line that is just "- 3 -"
+_PAGE_NUMBER_RE = re.compile(
+    r'\bpage\s*\d+(?:\s*(?:of|/)\s*\d+)?|^\W*\d+(?:\s*(?:of|/)\s*\d+)?\W*$',
+    re.IGNORECASE,
+)
+
+
+def _boilerplate_key(line: str) -> str:
+    """
+    Normalize a line so "Page 3 of 40" and "Page 4 of 40" compare equal.
+    Only page numbers are masked: other lines must repeat exactly, so
+    "Total due: 120" and "Total due: 95" stay distinct.
+    """
+    line = _PAGE_NUMBER_RE.sub(lambda m: _DIGITS_RE.sub('#', m.group()), line.strip())
+    return _SPACE_RE.sub(' ', line).lower()
+
+
+def _edge_line_indexes(lines: List[str]) -> List[int]:
+    """Top and bottom non-blank lines, leaving at least one body line in between."""
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    edge = min(BOILERPLATE_EDGE_LINES, (len(filled) - 1) // 2)
+    if edge <= 0:
+        return []
+    return filled[:edge] + filled[-edge:]
+
+
+def _strip_boilerplate(records: List[Dict]) -> tuple:
+    """
+    Learn the lines a document repeats at the top or bottom of its pages
+    (letterheads, confidentiality footers, "Page x of y") and remove them.
+
+    Only the first and last few non-blank lines of each page are
+    candidates, and a line counts as boilerplate once it appears on
+    BOILERPLATE_MIN_PAGES pages and BOILERPLATE_PAGE_RATIO of all pages.
+    Table row groups are left untouched.
+
+    Returns:
+        (records with boilerplate removed, number of characters removed)
+    """
+    prose = [r for r in records if not r.get("rows")]
+    page_count = len({r["page"] for r in prose})
+    threshold = max(BOILERPLATE_MIN_PAGES, BOILERPLATE_PAGE_RATIO * page_count)
+    if page_count < threshold:
+        return records, 0
+
+    pages_with = defaultdict(set)
+    for record in prose:
+        lines = record["text"].split("\n")
+        for i in _edge_line_indexes(lines):
+            pages_with[_boilerplate_key(lines[i])].add(record["page"])
+    boilerplate = {key for key, pages in pages_with.items() if len(pages) >= threshold}
+    if not boilerplate:
+        return records, 0
+
+    kept, removed = [], 0
+    for record in records:
+        if record.get("rows"):
+            kept.append(record)
+            continue
+        lines = record["text"].split("\n")
+        drop = {i for i in _edge_line_indexes(lines)
+                if _boilerplate_key(lines[i]) in boilerplate}
+        if not drop:
+            kept.append(record)
+            continue
+        text = "\n".join(line for i, line in enumerate(lines) if i not in drop).strip()
+        removed += len(record["text"]) - len(text)
+        if text:
+            kept.append({**record, "text": text})
+    return kept, removed
+
+
+# ---------------------------------------------------------------------------
+# Isolated extraction — one child process per file, with time/memory budgets
+# ---------------------------------------------------------------------------
+
+_RSS_POLL_SECONDS = 0.1
+
+
+def _isolated_worker(conn, file_path: Path, options: Dict, detected: Optional[str],
+                     limit: Optional[int]) -> None:
+    """Child-process entry point: extract one file and send the records back."""
+    if hasattr(os, "setsid"):
+        os.setsid()  # own process group, so a kill also reaches page workers
+    try:
+        conn.send(("ok", _extract_file(file_path, options, detected, limit)))
+    except MemoryError:
+        conn.send(("memory", "MemoryError during extraction"))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+
+_PAGE_MB = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024) if hasattr(os, "sysconf") else 0
+
+
+def _process_group_rss_mb(pgid: int) -> Optional[float]:
+    """
+    Resident set size in MB of every process in a process group (Linux
+    /proc), so OCR and rasterizer subprocesses count towards the budget;
+    None if unknown.
+    """
+    total, found = 0, False
+    try:
+        pids = [entry for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return None
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # Fields after the parenthesised command name: state, ppid, pgrp, ...
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue  # exited while scanning
+        if int(fields[2]) == pgid:
+            total += int(fields[21]) * _PAGE_MB  # rss, in pages
+            found = True
+    return total if found else None
+
+
+def _kill_process_group(process) -> None:
+    """Kill the worker and anything it started, even if the worker already exited."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        if process.is_alive():
+            process.kill()
+    process.join()
+
+
+def _extract_isolated(file_path: Path, options: Dict,
+                      timeout: Optional[float], max_rss_mb: Optional[float],
+                      detected: Optional[str] = None, limit: Optional[int] = None):
+    """
+    Extract a file in a child process, killing it if it runs longer than
+    `timeout` seconds or its process group's resident memory exceeds
+    `max_rss_mb`. RSS is sampled from /proc, so the memory budget only
+    applies on Linux.
+
+    The child is spawned rather than forked: callers run this from worker
+    threads, possibly in a process that has torch/faiss loaded. Whatever
+    it started is killed with it, whatever the outcome.
+
+    Returns:
+        ("ok", records) | ("timeout" | "memory" | "error" | "crashed", reason)
+    """
+    context = multiprocessing.get_context("spawn")
+    recv_conn, send_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_isolated_worker, args=(send_conn, file_path, options, detected, limit), daemon=False
+    )
+    process.start()
+    send_conn.close()
+    started = time.monotonic()
+    try:
+        while True:
+            # Drain the pipe while waiting, or a large result would block the child
+            if recv_conn.poll(_RSS_POLL_SECONDS):
+                try:
+                    return recv_conn.recv()
+                except EOFError:
+                    process.join()
+                    return "crashed", f"worker exited with code {process.exitcode}"
+            elapsed = time.monotonic() - started
+            if timeout and elapsed > timeout:
+                return "timeout", f"exceeded {timeout:g}s time budget"
+            if max_rss_mb:
+                rss = _process_group_rss_mb(process.pid)
+                if rss is not None and rss > max_rss_mb:
+                    return "memory", f"exceeded {max_rss_mb:g} MB memory budget ({rss:.0f} MB)"
+            if not process.is_alive() and not recv_conn.poll():
+                process.join()
+                return "crashed", f"worker exited with code {process.exitcode}"
+    finally:
+        recv_conn.close()
+        _kill_process_group(process)
 
 
 # ---------------------------------------------------------------------------
@@ -397,69 +1580,502 @@ class DocumentLoader:
     Each dict is compatible with the rest of the V2 pipeline.
     """
 
-    def __init__(self):
-        pass
-
-    def load_document(self, file_path: str) -> Optional[Dict]:
+    def __init__(self, workers: int = 1, cache=None, options: Optional[Dict] = None,
+                 timeout: Optional[float] = None, max_rss_mb: Optional[float] = None,
+                 strip_boilerplate: bool = True, include: Optional[List[str]] = None,
+                 exclude: Optional[List[str]] = None, max_depth: Optional[int] = None):
+        """
+        Args:
+            workers: Default number of extraction processes used by
+                     load_directory (1 = extract on the calling thread)
+            cache: Optional ExtractionCache; files whose content hash is
+                   already cached are not parsed again
+            options: Overrides for DEFAULT_OPTIONS (PDF backend, page workers, ...)
+            timeout: Per-file wall-clock budget in seconds
+            max_rss_mb: Per-file resident memory budget in MB, counting the
+                        subprocesses extraction starts (if either budget is
+                        set, every file is extracted in its own spawned
+                        child process instead of the worker pool, and
+                        quarantined on a breach; both default to off)
+            strip_boilerplate: Remove header/footer lines repeated across a
+                               document's pages before it is returned
+            include: Glob patterns files must match to be loaded by
+                     load_directory (see scan_directory)
+            exclude: Glob patterns for files/directories load_directory skips
+            max_depth: Subdirectory levels load_directory descends (None = all)
+        """
+        self.workers = max(1, workers)
+        self.cache = cache
+        self.options = {**DEFAULT_OPTIONS, **(options or {})}
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.strip_boilerplate = strip_boilerplate
+        self.include = include
+        self.exclude = exclude
+        self.max_depth = max_depth
+        self.last_report = self._new_report()
+
+    def load_document(self, file_path: str, root: Optional[str] = None) -> Optional[Dict]:
+        """
+        Load a single file.
+
+        Args:
+            file_path: File to load
+            root: Directory the document is named relative to, as in
+                  load_directory (default: just the file name)
+        """
         file_path = Path(file_path)
         if not file_path.exists():
             logger.error(f"File not found: {file_path}")
             return None
-
-        raw_chunks = _extract_file(file_path)
-        if not raw_chunks:
-            logger.warning(f"No content extracted from {file_path.name}")
+        if _is_archive(file_path):
+            logger.error(f"{file_path.name} is an archive; use load_archive")
             return None
 
-        # Combine all chunks into a single document text
-        # (ChunkingEngine will re-chunk; raw_chunks preserve page/section info
-        #  which we embed into the text so context isn't lost)
-        full_text_parts = []
-        for chunk in raw_chunks:
-            section = chunk.get("section")
-            page = chunk.get("page", 1)
-            text = chunk.get("text", "").strip()
-            if section:
-                full_text_parts.append(f"[Section: {section} | Page: {page}] {text}")
-            else:
-                full_text_parts.append(f"[Page: {page}] {text}")
+        st = file_path.stat()
+        limit = self.ingestable_bytes(file_path, st)
+        _, detected, raw_chunks, _ = next(self._extract_many([file_path], workers=1,
+                                                             limits={file_path: limit}))
+        return self._build_document(file_path, raw_chunks, detected,
+                                    self._display_name(file_path, root), st, limit)
+
+    def load_tail(self, file_path: str, state: Dict) -> Optional[Dict]:
+        """
+        Load only what was appended to a CSV/text file since the last ingest.
+
+        Only complete lines are taken, so a line still being written is
+        left for the next run (a final line without a line break is taken
+        once the file has been quiet for APPEND_SETTLE_SECONDS). Page (and
+        CSV row) numbers continue from the previous ingest, and the CSV
+        header is repeated from it.
+
+        Args:
+            file_path: File that has grown
+            state: What was ingested before: {"doc_id", "offset", "next_page",
+                   "next_row", "header"} (see AppendState)
+
+        Returns:
+            Document dict for the new tail under the original doc_id, with
+            metadata["tail"] = [start offset, end offset], or None if no
+            complete new line was appended
+        """
+        file_path = Path(file_path)
+        start = state["offset"]
+        with open(file_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = _ingestable_end(mm, start, len(mm), os.fstat(f.fileno()).st_mtime)
+            if end <= start:
+                return None
+            records = list(_iter_tail(file_path, mm, start, end, state, self.options))
+
+        logger.info(f"Loaded tail of {file_path.name}: bytes {start}-{end}, {len(records)} record(s)")
+        return {
+            "doc_id": state["doc_id"],
+            "filename": file_path.name,
+            "pages": records,
+            "metadata": {
+                "format": file_path.suffix.lower().lstrip('.'),
+                "file_size": end,
+                "raw_chunk_count": len(records),
+                "tail": [start, end],
+            },
+        }
 
-        full_text = "\n".join(full_text_parts)
+    def scan(self, directory: Path) -> List[tuple]:
+        """
+        Files load_directory reads, in load order, with the loader's
+        include/exclude/max_depth rules applied.
 
-        doc_id = self._generate_doc_id(file_path)
+        Returns:
+            [(path, os.stat_result)] (see scan_directory)
+        """
+        return scan_directory(directory, self.include, self.exclude, self.max_depth)
 
-        return {
+    def iter_pages(self, file_path: str) -> Iterator[Dict]:
+        """
+        Stream a document's raw page/section records one at a time.
+
+        Unlike load_document, nothing is accumulated: peak memory is bounded
+        by the largest single record rather than the whole document. Feed
+        the result to ChunkingEngine.chunk_stream. Boilerplate is not
+        stripped here, since learning it needs every page first.
+
+        Args:
+            file_path: Path of the document to read (an archive yields the
+                       records of each member in turn)
+
+        Yields:
+            {"source": str, "page": int, "section": str | None, "text": str}
+
+        Raises:
+            UnsupportedFormatError: if the content is binary no extractor reads
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            logger.error(f"File not found: {file_path}")
+            return
+        if not _is_archive(file_path):
+            yield from _iter_file(file_path, self.options)
+            return
+        for _, member, _ in _iter_archive_members(
+                file_path, self.options["archive_member_max_bytes"]):
+            if member is not None:
+                yield from _iter_file(member, self.options)
+
+    def _build_document(self, file_path: Path, raw_chunks: List[Dict], detected: Optional[str],
+                        name: Optional[str] = None,
+                        st: Optional[os.stat_result] = None,
+                        limit: Optional[int] = None) -> Optional[Dict]:
+        """
+        Args:
+            detected: The file's _sniff_format result, from _extract_many
+            name: Document filename (default file_path.name; load_directory
+                  passes the path relative to the scanned directory)
+            st: The file's stat result, if the scanner already has it
+            limit: Bytes the extractor was limited to (see ingestable_bytes);
+                   recorded as metadata["ingested_bytes"]
+        """
+        name = name or file_path.name
+        if not raw_chunks:
+            logger.warning(f"No content extracted from {name}")
+            return None
+
+        # Page/section records are kept as-is; ChunkingEngine chunks within
+        # them and carries page/section through as chunk metadata
+        boilerplate_chars = 0
+        if self.strip_boilerplate and detected in BOILERPLATE_FORMATS:
+            raw_chunks, boilerplate_chars = _strip_boilerplate(raw_chunks)
+            if boilerplate_chars:
+                logger.info(f"Stripped {boilerplate_chars} boilerplate chars from {name}")
+        st = st or file_path.stat()
+        doc_id = self._generate_doc_id(name)
+        limited = limit is not None and detected in ("text", "empty")
+
+        doc = {
             "doc_id": doc_id,
-            "filename": file_path.name,
-            "text": full_text,
+            "filename": name,
+            "pages": raw_chunks,
             "metadata": {
                 "format": file_path.suffix.lower().lstrip('.'),
-                "file_size": file_path.stat().st_size,
+                "detected_format": detected,
+                "file_size": st.st_size,
+                # Where an --append run should continue from
+                "ingested_bytes": limit if limited else st.st_size,
                 "raw_chunk_count": len(raw_chunks),
+                "boilerplate_chars": boilerplate_chars,
             },
         }
+        if limited and file_path.suffix.lower() == '.csv':
+            # Parsed, so a header with a quoted line break survives for tails
+            doc["metadata"]["table_header"] = read_csv_header(file_path)
+        return doc
 
-    def load_directory(self, directory_path: str) -> List[Dict]:
+    @staticmethod
+    def ingestable_bytes(file_path: Path, st: os.stat_result) -> Optional[int]:
+        """
+        For a CSV/text file that may still be growing (APPENDABLE_SUFFIXES),
+        the offset to extract up to: the end of its last complete line within
+        the st_size bytes the scan saw (see _ingestable_end). Lines written
+        after the scan, or still being written, are left for --append.
+
+        Args:
+            file_path: File to check
+            st: Its stat result from the scan
+
+        Returns:
+            Byte offset, or None for other files, which are read whole
+        """
+        if isinstance(file_path, ArchiveMember) or file_path.suffix.lower() not in APPENDABLE_SUFFIXES:
+            return None
+        if st.st_size == 0:
+            return 0
+        try:
+            with open(file_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _ingestable_end(mm, 0, min(st.st_size, len(mm)), st.st_mtime)
+        except (OSError, ValueError):
+            return None  # unreadable or truncated since the scan: extraction reports it
+
+    def load_directory(self, directory_path: str, workers: Optional[int] = None,
+                       scanned: Optional[List[tuple]] = None) -> List[Dict]:
+        """
+        Load every file under a directory.
+
+        Args:
+            directory_path: Directory to scan recursively, subject to the
+                            loader's include/exclude/max_depth rules. Archives
+                            in it are expanded in place, as with load_archive.
+                            Documents are named by their path relative to it.
+            workers: Number of extraction processes; defaults to self.workers.
+                     With more than one worker, per-file extraction runs in a
+                     process pool. Documents are always returned in path
+                     order regardless of which worker finishes first.
+            scanned: Result of scan(directory_path) if the caller already
+                     has it, so the tree is not walked twice
+
+        Returns:
+            List of document dicts. A summary of the run (loaded, empty,
+            failed and quarantined files, boilerplate characters stripped,
+            PDF pages per text backend or "ocr") is left in self.last_report.
+        """
         directory = Path(directory_path)
-        documents = []
+        report = self.last_report = self._new_report()
 
         if not directory.is_dir():
             logger.error(f"Not a directory: {directory_path}")
-            return documents
+            return []
+
+        if scanned is None:
+            scanned = self.scan(directory)
+        documents = self._load_files([path for path, _ in scanned], workers, report,
+                                     root=directory, stats=dict(scanned))
+        logger.info(f"Loaded {len(documents)} documents from {directory_path}")
+        return documents
+
+    def load_archive(self, archive_path: str,
+                     workers: Optional[int] = None) -> List[Dict]:
+        """
+        Load every member of a .zip / .tar(.gz|.bz2|.xz) archive.
+
+        Members are streamed out of the archive straight into the matching
+        extractor; nothing is unpacked to disk. Each document's filename
+        and doc_id are based on "<archive name>/<member path>".
+
+        Args:
+            archive_path: Archive to read
+            workers: Number of extraction processes; defaults to self.workers
+
+        Returns:
+            List of document dicts, in archive order (report in self.last_report)
+        """
+        archive_path = Path(archive_path)
+        report = self.last_report = self._new_report()
+        if not archive_path.is_file():
+            logger.error(f"File not found: {archive_path}")
+            return []
+        documents = self._load_files([archive_path], workers, report)
+        logger.info(f"Loaded {len(documents)} documents from {archive_path.name}")
+        return documents
 
-        for file_path in directory.iterdir():
-            if file_path.is_file() and not file_path.name.startswith('.'):
-                doc = self.load_document(file_path)
+    def _load_files(self, files: List[Path], workers: Optional[int], report: Dict,
+                    root: Optional[Path] = None, stats: Optional[Dict] = None) -> List[Dict]:
+        documents = []
+        stats = stats or {}
+        workers = max(1, workers or self.workers)
+        for batch in self._iter_batches(files, workers, report, root):
+            limits = {file_path: self.ingestable_bytes(file_path, stats[file_path])
+                      for file_path in batch if file_path in stats}
+            for file_path, detected, raw_chunks, problem in self._extract_many(batch, workers, limits):
+                name = self._display_name(file_path, root)
+                if problem:
+                    bucket = "quarantined" if problem["quarantined"] else "failed"
+                    report[bucket].append({"file": name, "reason": problem["reason"]})
+                    continue
+                doc = self._build_document(file_path, raw_chunks, detected, name,
+                                           stats.get(file_path), limits.get(file_path))
                 if doc:
                     documents.append(doc)
-                    logger.info(f"Loaded: {file_path.name}")
+                    report["boilerplate_chars"] += doc["metadata"]["boilerplate_chars"]
+                    for record in doc["pages"]:
+                        if record.get("backend"):
+                            backends = report["backends"]
+                            backends[record["backend"]] = backends.get(record["backend"], 0) + 1
+                    logger.info(f"Loaded: {name}")
                 else:
-                    logger.warning(f"Skipped (no content): {file_path.name}")
+                    report["empty"].append(name)
+                    logger.warning(f"Skipped (no content): {name}")
 
-        logger.info(f"Loaded {len(documents)} documents from {directory_path}")
+        report["loaded"] = len(documents)
+        if report["quarantined"]:
+            logger.warning(f"Quarantined {len(report['quarantined'])} file(s): "
+                           f"{', '.join(q['file'] for q in report['quarantined'])}")
         return documents
 
     @staticmethod
-    def _generate_doc_id(file_path: Path) -> str:
-        mtime = file_path.stat().st_mtime
-        return f"{file_path.stem}_{int(mtime)}"
\ No newline at end of file
+    def _display_name(file_path: Path, root: Optional[Path]) -> str:
+        """Path relative to the scanned directory (archive members carry their own)."""
+        if root is None or isinstance(file_path, ArchiveMember):
+            return file_path.name
+        return file_path.relative_to(root).as_posix()
+
+    def _iter_batches(self, files: List[Path], workers: int, report: Dict,
+                      root: Optional[Path] = None):
+        """
+        Group files into extraction batches. Consecutive plain files form
+        one batch; an archive is streamed as batches of up to 2 * workers
+        members, so only that many members are held in memory at once while
+        the workers process them concurrently.
+        """
+        plain = []
+        for file_path in files:
+            if not _is_archive(file_path):
+                plain.append(file_path)
+                continue
+            if plain:
+                report["files"] += len(plain)
+                yield plain
+                plain = []
+            yield from self._iter_member_batches(file_path, workers, report,
+                                                 self._display_name(file_path, root))
+        if plain:
+            report["files"] += len(plain)
+            yield plain
+
+    def _iter_member_batches(self, archive_path: Path, workers: int, report: Dict,
+                             archive_name: Optional[str] = None):
+        batch = []
+        try:
+            for name, member, refused in _iter_archive_members(
+                    archive_path, self.options["archive_member_max_bytes"], archive_name):
+                report["files"] += 1
+                if member is None:
+                    logger.warning(f"Quarantined {name}: {refused}")
+                    report["quarantined"].append({"file": name, "reason": refused})
+                    continue
+                batch.append(member)
+                if len(batch) >= 2 * workers:
+                    yield batch
+                    batch = []
+        except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) as e:
+            logger.error(f"Could not read archive {archive_name or archive_path.name}: {e}")
+            report["failed"].append({"file": archive_name or archive_path.name, "reason": str(e)})
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _new_report() -> Dict:
+        return {"files": 0, "loaded": 0, "empty": [], "failed": [], "quarantined": [],
+                "boilerplate_chars": 0, "backends": {}}
+
+    def _extract_many(self, files: List[Path], workers: int,
+                      limits: Optional[Dict[Path, Optional[int]]] = None):
+        """
+        Yield (file_path, detected format, raw_chunks, problem) for each
+        file, in input order. Each file is sniffed once, here, and the
+        result is handed to its extractor, along with the file's read
+        limit from `limits` (see ingestable_bytes). Cached files are served from
+        the extraction cache; only the rest are parsed. A file whose
+        extraction fails yields no chunks and a problem dict ({"reason",
+        "quarantined"}), so one bad file never aborts the batch.
+        """
+        formats = [_try_sniff_format(file_path) for file_path in files]
+        limits = [(limits or {}).get(file_path) for file_path in files]
+        keys = [self._cache_key(file_path, limit) for file_path, limit in zip(files, limits)]
+        cached = [self.cache.get(key) if key else None for key in keys]
+        pending = [i for i, hit in enumerate(cached) if hit is None]
+        if self.cache:
+            logger.info(
+                f"Extraction cache: {len(files) - len(pending)} hit(s), "
+                f"{len(pending)} file(s) to parse"
+            )
+
+        results = self._run_extractors([files[i] for i in pending], [formats[i] for i in pending],
+                                       [limits[i] for i in pending], workers)
+        for i, file_path in enumerate(files):
+            if cached[i] is not None:
+                yield file_path, formats[i], self._from_cache(cached[i], file_path.name), None
+                continue
+            raw_chunks, problem = next(results)
+            if problem is None and keys[i]:
+                self.cache.put(keys[i], self._to_cache(raw_chunks, file_path.name))
+            yield file_path, formats[i], raw_chunks or [], problem
+
+    def _run_extractors(self, files: List[Path], formats: List[Optional[str]],
+                        limits: List[Optional[int]], workers: int):
+        """Yield (raw_chunks, problem) for each file, in input order."""
+        options = self.options
+        if self.timeout or self.max_rss_mb:
+            yield from self._run_isolated(files, formats, limits, workers)
+            return
+
+        if workers <= 1 or len(files) <= 1:
+            for file_path, detected, limit in zip(files, formats, limits):
+                try:
+                    yield _extract_file(file_path, options, detected, limit), None
+                except Exception as e:
+                    logger.error(f"Extraction failed for {file_path.name}: {e}")
+                    yield None, {"reason": str(e), "quarantined": False}
+            return
+
+        logger.info(f"Extracting {len(files)} files with {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+            futures = [pool.submit(_extract_file, file_path, options, detected, limit)
+                       for file_path, detected, limit in zip(files, formats, limits)]
+            for file_path, future in zip(files, futures):
+                try:
+                    yield future.result(), None
+                except Exception as e:
+                    logger.error(f"Extraction failed for {file_path.name}: {e}")
+                    yield None, {"reason": str(e), "quarantined": False}
+
+    def _run_isolated(self, files: List[Path], formats: List[Optional[str]],
+                      limits: List[Optional[int]], workers: int):
+        """
+        Extract each file in its own child process under the time/memory
+        budgets; up to `workers` children run at once. Budget breaches
+        and crashes are reported as quarantined.
+        """
+        logger.info(
+            f"Extracting {len(files)} files in isolated workers "
+            f"(timeout={self.timeout}s, max_rss={self.max_rss_mb}MB, workers={workers})"
+        )
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(files) or 1))) as pool:
+            futures = [
+                pool.submit(_extract_isolated, file_path, self.options,
+                            self.timeout, self.max_rss_mb, detected, limit)
+                for file_path, detected, limit in zip(files, formats, limits)
+            ]
+            for file_path, future in zip(files, futures):
+                status, payload = future.result()
+                if status == "ok":
+                    yield payload, None
+                    continue
+                quarantined = status != "error"
+                log = logger.warning if quarantined else logger.error
+                log(f"{'Quarantined' if quarantined else 'Extraction failed for'} "
+                    f"{file_path.name}: {payload}")
+                yield None, {"reason": payload, "quarantined": quarantined}
+
+    @staticmethod
+    def _to_cache(raw_chunks: List[Dict], name: str) -> List[Dict]:
+        """
+        Records as cached: entries are keyed by content, so a "source" is
+        stored without the file name ("" or e.g. ":Table2") and a copy
+        under another name gets its own name back from _from_cache.
+        """
+        return [
+            {**record, "source": record["source"][len(name):]}
+            if record.get("source", "").startswith(name) else record
+            for record in raw_chunks
+        ]
+
+    @staticmethod
+    def _from_cache(cached: List[Dict], name: str) -> List[Dict]:
+        """Cached records with "source" rebuilt for the file being loaded."""
+        for record in cached:
+            if "source" in record:
+                record["source"] = name + record["source"]
+        return cached
+
+    def _cache_key(self, file_path: Path, limit: Optional[int] = None) -> Optional[str]:
+        if not self.cache:
+            return None
+        try:
+            output_options = {k: v for k, v in self.options.items()
+                              if not k.endswith(("_workers", "_cache_dir"))}
+            version = f"{EXTRACTOR_VERSION}:{json.dumps(output_options, sort_keys=True)}"
+            if limit is not None:  # a prefix read: the content hash may cover bytes past it
+                version += f":{limit}"
+            return self.cache.make_key(file_path, version)
+        except OSError as e:
+            logger.warning(f"Could not hash {file_path.name} for caching: {e}")
+            return None
+
+    @staticmethod
+    def _generate_doc_id(name: str) -> str:
+        """
+        The document's path relative to the scanned directory (or
+        "<archive>/<member>"). It does not depend on mtime, so touching or
+        editing a file keeps its doc_id and the IDs of its unchanged chunks.
+        """
+        return name
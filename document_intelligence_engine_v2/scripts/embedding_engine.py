@@ -7,13 +7,10 @@ import logging
 from typing import List, Union, Optional
 import numpy as np
 
-try:
-    from sentence_transformers import SentenceTransformer
-except ImportError:
-    SentenceTransformer = None
-
 logger = logging.getLogger(__name__)
 
+SENTENCE_CACHE_SIZE = 100_000  # cached sentence vectors (cleared when full)
+
 
 class EmbeddingEngine:
     """
@@ -31,7 +28,11 @@ class EmbeddingEngine:
             batch_size: Batch size for embedding generation
             device: Device to use ("cpu" or "cuda")
         """
-        if SentenceTransformer is None:
+        # Imported here: sentence-transformers pulls in torch, which takes
+        # seconds to load and is only needed once a model is requested
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
             raise ImportError(
                 "sentence-transformers not installed. "
                 "Install with: pip install sentence-transformers"
@@ -48,6 +49,9 @@ class EmbeddingEngine:
         # Get embedding dimension
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         logger.info(f"Embedding dimension: {self.embedding_dim}")
+        
+        # Sentence vectors from semantic chunking, keyed by sentence text
+        self._sentence_cache = {}
     
     def embed_text(self, text: Union[str, List[str]], 
                    normalize: bool = True) -> np.ndarray:
@@ -81,11 +85,42 @@ class EmbeddingEngine:
         else:
             return embeddings
     
+    def embed_sentences(self, sentences: List[str]) -> np.ndarray:
+        """
+        Generate normalized embeddings for sentences, cached by text.
+        
+        Used by semantic chunking: the whole list is encoded in one call
+        (batched by batch_size inside the model), and repeated sentences
+        or re-chunking the same documents are served from the cache.
+        
+        Args:
+            sentences: Sentences to embed
+            
+        Returns:
+            numpy array of shape (len(sentences), embedding_dim)
+        """
+        if not sentences:
+            return np.zeros((0, self.embedding_dim), dtype=np.float32)
+        
+        misses = [s for s in dict.fromkeys(sentences) if s not in self._sentence_cache]
+        if misses:
+            vectors = self.embed_text(misses, normalize=True)
+            if len(self._sentence_cache) + len(misses) > SENTENCE_CACHE_SIZE:
+                self._sentence_cache.clear()
+            self._sentence_cache.update(zip(misses, vectors))
+        return np.array([self._sentence_cache[s] for s in sentences])
+    
     def embed_chunks(self, chunks: List[dict], 
                      normalize: bool = True) -> List[dict]:
         """
         Generate embeddings for multiple chunks.
         
+        Chunks that already carry an 'embedding' (built from cached
+        sentence vectors by semantic chunking, or reused from the vector
+        store for unchanged chunks) are kept as they are. Each distinct
+        text is embedded once, so a one-chunk section's unit shares its
+        chunk's vector.
+        
         Args:
             chunks: List of chunk dictionaries with 'text' field
             normalize: Whether to normalize embeddings
@@ -97,16 +132,25 @@ class EmbeddingEngine:
             logger.warning("No chunks to embed")
             return chunks
         
-        # Extract texts
-        texts = [chunk.get("text", "") for chunk in chunks]
+        pending = [chunk for chunk in chunks if chunk.get("embedding") is None]
+        if len(pending) < len(chunks):
+            logger.info(f"Reusing existing vectors for {len(chunks) - len(pending)} chunks")
+        if not pending:
+            return chunks
+        
+        # Extract texts, each distinct one once
+        positions = {}
+        for chunk in pending:
+            positions.setdefault(chunk.get("text", ""), len(positions))
+        texts = list(positions)
         
         # Generate embeddings
-        logger.info(f"Embedding {len(texts)} chunks")
+        logger.info(f"Embedding {len(texts)} distinct texts for {len(pending)} chunks")
         embeddings = self.embed_text(texts, normalize=normalize)
         
         # Add embeddings to chunks
-        for i, chunk in enumerate(chunks):
-            chunk["embedding"] = embeddings[i]
+        for chunk in pending:
+            chunk["embedding"] = embeddings[positions[chunk.get("text", "")]]
         
         return chunks
     
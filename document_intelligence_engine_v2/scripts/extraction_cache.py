@@ -0,0 +1,97 @@
+"""
+Extraction cache for skipping re-parsing of unchanged files.
+Raw page/section chunks are stored on disk keyed by file content hash
+plus extractor version, so copies, touches and redeploys still hit.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1024 * 1024  # bytes read per hashing step
+
+
+def file_sha256(file_path: Path) -> str:
+    """Hash a file's contents without loading it into memory."""
+    digest = hashlib.sha256()
+    with file_path.open('rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of raw extractor output.
+    One JSON file per entry, sharded by the first two hex digits of the key.
+    """
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize the extraction cache.
+
+        Args:
+            cache_dir: Directory holding cache entries (created on first write)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, file_path: Path, version: str) -> str:
+        """
+        Build a cache key from file contents and extractor version.
+
+        Args:
+            file_path: File to hash
+            version: Extractor version; bump it to invalidate old entries
+
+        Returns:
+            Hex digest identifying this (content, extractor) pair
+        """
+        content_hash = file_sha256(file_path)
+        return hashlib.sha256(f"{version}:{content_hash}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """
+        Look up cached raw chunks.
+
+        Returns:
+            List of raw chunk dicts, or None on a miss
+        """
+        path = self._entry_path(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                chunks = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return chunks
+
+    def put(self, key: str, chunks: List[Dict]) -> None:
+        """Store raw chunks under a key (atomic replace)."""
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(chunks, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry: {e}")
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
@@ -0,0 +1,160 @@
+"""
+Columnar extraction store.
+Persists the page/section records of loaded documents to one compressed
+Parquet file (doc_id, page, section, text, ...), so chunking can be re-run
+with new sizes without parsing or OCR'ing anything again.
+"""
+
+import logging
+import os
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+pa = None  # pyarrow and pyarrow.parquet, imported by _load_pyarrow on first use
+pq = None
+
+COMPRESSION = "zstd"
+ROWS_PER_BATCH = 4096  # records converted to/from Arrow at a time
+
+
+def _load_pyarrow() -> bool:
+    """Import pyarrow on first use; returns whether it is installed."""
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            return False
+        pa, pq = pyarrow, pyarrow.parquet
+    return True
+
+
+def _schema():
+    return pa.schema([
+        ("doc_id", pa.string()),
+        ("filename", pa.string()),
+        ("format", pa.string()),
+        ("source", pa.string()),
+        ("page", pa.int32()),
+        ("section", pa.string()),
+        ("text", pa.string()),
+        ("rows", pa.list_(pa.int32())),  # [first, last] for table row groups
+        ("backend", pa.string()),  # PDF pages: text layer backend, or "ocr"
+    ])
+
+
+class ExtractionStore:
+    """
+    One Parquet file holding every record of every loaded document,
+    written in document order so a document's records are contiguous.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Parquet file to write/read (parent created on write)
+        """
+        self.path = Path(path)
+
+    @staticmethod
+    def available() -> bool:
+        """Whether pyarrow is installed."""
+        return _load_pyarrow()
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def write(self, documents: List[Dict]) -> int:
+        """
+        Replace the store with the records of `documents` (atomic replace).
+
+        Args:
+            documents: Document dicts from DocumentLoader
+
+        Returns:
+            Number of records written
+        """
+        if not _load_pyarrow():
+            logger.error("pyarrow not installed: pip install pyarrow")
+            return 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        schema = _schema()
+        written = 0
+        with pq.ParquetWriter(tmp_path, schema, compression=COMPRESSION) as writer:
+            batch = []
+            for doc in documents:
+                for record in doc["pages"]:
+                    batch.append({
+                        "doc_id": doc["doc_id"],
+                        "filename": doc["filename"],
+                        "format": doc["metadata"].get("format"),
+                        "source": record.get("source"),
+                        "page": record.get("page"),
+                        "section": record.get("section"),
+                        "text": record["text"],
+                        "rows": record.get("rows"),
+                        "backend": record.get("backend"),
+                    })
+                    if len(batch) >= ROWS_PER_BATCH:
+                        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                        written += len(batch)
+                        batch = []
+            if batch:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                written += len(batch)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Wrote {written} records for {len(documents)} documents to {self.path}")
+        return written
+
+    def iter_records(self, columns: Optional[List[str]] = None) -> Iterator[Dict]:
+        """Stream stored records batch by batch, in document order."""
+        if not _load_pyarrow():
+            logger.error("pyarrow not installed: pip install pyarrow")
+            return
+        parquet = pq.ParquetFile(self.path)
+        for batch in parquet.iter_batches(batch_size=ROWS_PER_BATCH, columns=columns):
+            yield from batch.to_pylist()
+
+    def iter_documents(self) -> Iterator[Tuple[str, Iterator[Dict]]]:
+        """
+        Yield (doc_id, records) per document without materializing the store.
+        Each records iterator must be consumed before advancing to the next.
+        """
+        for doc_id, rows in groupby(self.iter_records(), key=lambda r: r["doc_id"]):
+            yield doc_id, (self._to_record(row) for row in rows)
+
+    def load_documents(self) -> List[Dict]:
+        """Rebuild document dicts (as returned by DocumentLoader) from the store."""
+        documents = []
+        for doc_id, rows in groupby(self.iter_records(), key=lambda r: r["doc_id"]):
+            rows = list(rows)
+            documents.append({
+                "doc_id": doc_id,
+                "filename": rows[0]["filename"],
+                "pages": [self._to_record(row) for row in rows],
+                "metadata": {
+                    "format": rows[0]["format"],
+                    "raw_chunk_count": len(rows),
+                },
+            })
+        return documents
+
+    @staticmethod
+    def _to_record(row: Dict) -> Dict:
+        record = {
+            "source": row["source"],
+            "page": row["page"],
+            "section": row["section"],
+            "text": row["text"],
+        }
+        if row["rows"]:
+            record["rows"] = row["rows"]
+        if row.get("backend"):  # absent from stores written before the column existed
+            record["backend"] = row["backend"]
+        return record
@@ -4,7 +4,6 @@ Generation engine using Groq API.
 
 import logging
 import os
-from groq import Groq
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +11,8 @@ logger = logging.getLogger(__name__)
 class GenerationEngine:
 
     def __init__(self, api_key: str, model_name: str = "llama-3.1-8b-instant"):
+        from groq import Groq
+
         self.client = Groq(api_key=api_key)
         self.model_name = model_name
         logger.info(f"GenerationEngine initialized with model: {model_name}")
@@ -9,16 +9,23 @@ import os
 import logging
 import argparse
 import sys
+from collections import Counter
 from pathlib import Path
 import numpy as np
 
 import config
-from document_loader import DocumentLoader
+from document_loader import APPENDABLE_SUFFIXES, ARCHIVE_SUFFIXES, DocumentLoader
+from extraction_cache import ExtractionCache
+from extraction_store import ExtractionStore
+from append_state import AppendState
 from chunking_engine import ChunkingEngine
+from chunk_deduplicator import ChunkDeduplicator
+from chunk_filter import ChunkFilter
 from embedding_engine import EmbeddingEngine
 from vector_store_manager import VectorStoreManager
 from retriever import Retriever
 from context_builder import ContextBuilder
+from token_counter import load_token_counter
 from generation_engine import GenerationEngine
 
 
@@ -30,9 +37,227 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def ingest_command():
-    """Ingest documents from data/ folder into FAISS."""
+def _make_token_counter():
+    """TokenCounter for the embedding model when CHUNK_SIZING is "tokenizer", else None."""
+    if config.CHUNK_SIZING != "tokenizer":
+        return None
+    return load_token_counter(config.EMBEDDING_MODEL, config.EMBEDDING_MAX_TOKENS)
+
+
+def _make_embedder() -> EmbeddingEngine:
+    return EmbeddingEngine(
+        model_name=config.EMBEDDING_MODEL,
+        batch_size=config.BATCH_SIZE,
+        device=config.DEVICE,
+    )
+
+
+def _make_chunker() -> ChunkingEngine:
+    """Chunker per config; in semantic mode it holds the EmbeddingEngine to reuse."""
+    return ChunkingEngine(
+        min_chunk_size=config.MIN_CHUNK_SIZE,
+        max_chunk_size=config.MAX_CHUNK_SIZE,
+        overlap_ratio=config.CHUNK_OVERLAP,
+        token_counter=_make_token_counter(),
+        sentence_embedder=_make_embedder() if config.CHUNKING_MODE == "semantic" else None,
+        semantic_threshold=config.SEMANTIC_THRESHOLD,
+        levels=config.INDEX_LEVELS,
+    )
+
+
+def _count_chunks(units) -> int:
+    """Chunks among chunker output (sentence/section units excluded)."""
+    return sum(1 for unit in units if unit.get("level", "chunk") == "chunk")
+
+
+def _describe_units(units) -> str:
+    """E.g. "120 chunks" or "120 chunks (+ 950 sentence, 14 section units)"."""
+    levels = Counter(unit.get("level", "chunk") for unit in units)
+    chunks = levels.pop("chunk", 0)
+    if not levels:
+        return f"{chunks} chunks"
+    extra = ", ".join(f"{count} {level}" for level, count in sorted(levels.items()))
+    return f"{chunks} chunks (+ {extra} units)"
+
+
+def _filter_noise(chunks):
+    """Drop or down-weight low-information chunks (per NOISE_FILTER); returns the chunks to index."""
+    if config.NOISE_FILTER == "off":
+        return chunks
+    chunk_filter = ChunkFilter(min_score=config.NOISE_MIN_SCORE, mode=config.NOISE_FILTER,
+                               weight=config.NOISE_WEIGHT)
+    kept = chunk_filter.apply(chunks)
+    noise = chunk_filter.last_stats["noise"]
+    if noise:
+        action = "Dropped" if config.NOISE_FILTER == "drop" else "Down-weighted"
+        print(f"🧹 {action} {noise} low-information chunk(s) (signatures, dates, page numbers...)")
+    return kept
+
+
+def _deduplicate(chunks):
+    """Fold near-duplicate chunks into canonical ones (if enabled); returns the chunks to index."""
+    if not config.DEDUP_CHUNKS:
+        return chunks
+    deduplicator = ChunkDeduplicator(threshold=config.DEDUP_THRESHOLD)
+    canonical = deduplicator.deduplicate(chunks)
+    duplicates = deduplicator.last_stats["duplicates"]
+    if duplicates:
+        print(f"🧬 Folded {duplicates} near-duplicate chunk(s) into {len(canonical)} to embed")
+    return canonical
+
+
+def _embed_and_store(chunks, append: bool = False, embedder: EmbeddingEngine = None):
+    """
+    Embed chunks and replace the FAISS index with them (or add to it).
+    Chunks whose chunk_id is already in the index keep their stored vector,
+    so re-ingesting an edited document only embeds the chunks that changed.
+    """
+    vector_store = VectorStoreManager(
+        embedding_dim=config.EMBEDDING_DIMENSION,
+        index_type=config.FAISS_INDEX_TYPE,
+        index_path=config.FAISS_INDEX_PATH,
+        metadata_path=config.METADATA_PATH,
+        embedding_model=config.EMBEDDING_MODEL,
+    )
+    if config.FAISS_INDEX_PATH.exists():
+        vector_store.load()
+    stored = vector_store.get_embeddings(
+        [c["chunk_id"] for c in chunks if c.get("embedding") is None]
+    )
+    for chunk in chunks:
+        if chunk["chunk_id"] in stored and chunk.get("embedding") is None:
+            chunk["embedding"] = stored[chunk["chunk_id"]]
+    if stored:
+        print(f"♻️  Reusing {len(stored)} stored embedding(s) of unchanged chunks")
+
+    # 3. Generate embeddings
+    print("🧠 Generating embeddings...")
+    embedder = embedder or _make_embedder()
+    chunks = embedder.embed_chunks(chunks)
+    print(f"✓ Generated embeddings ({config.EMBEDDING_DIMENSION} dimensions)")
+
+    # 4. Store in FAISS (a full ingest rebuilds the index, dropping stale chunks)
+    print("💾 Storing in FAISS...")
+    if not append:
+        vector_store.reset()
+
+    embeddings = np.array([c["embedding"] for c in chunks], dtype=np.float32)
+    metadata_list = [
+        {
+            "chunk_id": c["chunk_id"],
+            "doc_id": c["doc_id"],
+            "text": c["text"],
+            "chunk_index": c["chunk_index"],
+            "token_count": c["token_count"],
+            "page": c.get("page"),
+            "page_end": c.get("page_end"),
+            "section": c.get("section"),
+            "level": c.get("level", "chunk"),
+            "parent_id": c.get("parent_id"),
+            "duplicates": c.get("duplicates", []),
+            "weight": c.get("weight", 1.0),
+        }
+        for c in chunks
+    ]
+
+    vector_store.add_embeddings(embeddings, metadata_list)
+    vector_store.save()
+
+    print(f"✓ Saved FAISS index to {config.VECTOR_STORE_DIR}")
+
+
+def _ingested_bytes(loader: DocumentLoader, file_path: Path, st, doc) -> int:
+    """Offset an --append run should continue `file_path` from."""
+    if doc:
+        return doc["metadata"]["ingested_bytes"]
+    # No document (e.g. its only line is still being written): still stop at the last complete line
+    limit = loader.ingestable_bytes(file_path, st)
+    return st.st_size if limit is None else limit
+
+
+def _record_append_state(state: AppendState, loader: DocumentLoader, data_dir: Path,
+                         scanned, documents, chunks):
+    """Remember what a full ingest read from each file, for later --append runs."""
+    docs_by_name = {doc["filename"]: doc for doc in documents}
+    chunk_counts = Counter(c["doc_id"] for c in chunks if c.get("level", "chunk") == "chunk")
+    state.clear()
+    for file_path, st in scanned:
+        doc = docs_by_name.get(file_path.relative_to(data_dir).as_posix())
+        state.record(file_path, _ingested_bytes(loader, file_path, st, doc), doc,
+                     chunk_counts[doc["doc_id"]] if doc else 0)
+    state.save()
+
+
+def append_ingest(loader: DocumentLoader, data_dir: Path) -> int:
+    """
+    Add only what changed since the last ingest to the existing index:
+    the appended tail of growing CSV/text/log files, plus new files.
+    """
+    state = AppendState(config.APPEND_STATE_PATH)
+    if not state.entries or not config.FAISS_INDEX_PATH.exists():
+        print("⚠️  No previous ingest recorded; run a full ingest first")
+        return 1
+
+    chunker = _make_chunker()
+    chunks, tails, new_docs, rewritten = [], [], [], []
+    for file_path, _ in loader.scan(data_dir):
+        status, entry = state.check(file_path)
+        if status == "unchanged":
+            continue
+        appendable = file_path.suffix.lower() in APPENDABLE_SUFFIXES
+        if status == "appended" and appendable and entry["doc_id"]:
+            tail = loader.load_tail(file_path, entry)
+            if tail:
+                # Scoped by offset: a tail line repeating earlier text must not reuse its ID
+                tail_chunks = list(chunker.chunk_stream(tail["pages"], tail["doc_id"],
+                                                        start_index=entry["next_chunk"],
+                                                        id_scope=f"@{entry['offset']}"))
+                chunks.extend(tail_chunks)
+                tails.append((file_path, tail, _count_chunks(tail_chunks)))
+        elif status == "new" and file_path.name.lower().endswith(ARCHIVE_SUFFIXES):
+            for doc in loader.load_archive(str(file_path)):
+                chunks.extend(chunker.chunk_document(doc))
+            new_docs.append((file_path, None, 0))
+        elif status == "new" or (status == "appended" and appendable):
+            doc = loader.load_document(str(file_path), root=str(data_dir))
+            doc_chunks = chunker.chunk_document(doc) if doc else []
+            chunks.extend(doc_chunks)
+            new_docs.append((file_path, doc, _count_chunks(doc_chunks)))
+        else:
+            # Old vectors of a rewritten file can't be removed from the index
+            rewritten.append(file_path.name)
+
+    for name in rewritten:
+        print(f"⚠️  {name} changed in place; run a full ingest to re-index it")
+    print(f"✓ {len(tails)} appended file(s), {len(new_docs)} new file(s)")
+    if not chunks:
+        print("✓ Nothing new to index")
+        return 0
+
+    print(f"✓ Created {_describe_units(chunks)}")
+    _embed_and_store(_deduplicate(_filter_noise(chunks)), append=True, embedder=chunker.sentence_embedder)
+    for file_path, tail, count in tails:
+        state.extend(file_path, tail, count)
+    for file_path, doc, count in new_docs:
+        offset = _ingested_bytes(loader, file_path, file_path.stat(), doc)
+        state.record(file_path, offset, doc, count)
+    state.save()
+    if config.USE_EXTRACTION_STORE:
+        print("   (the extraction store is only rewritten by a full ingest)")
+    print(f"\n✅ Append complete: {_count_chunks(chunks)} chunk(s) added")
+    return 0
+
+
+def ingest_command(workers: int = None, pdf_backend: str = None, append: bool = False,
+                   include=None, exclude=None, max_depth=None):
+    """Ingest documents from data/ folder (recursively) into FAISS."""
+    config.ensure_directories()
     data_dir = config.DATA_DIR
+    workers = workers or config.INGEST_WORKERS
+    extract_options = {
+        **config.EXTRACT_OPTIONS,
+        "pdf_backend": pdf_backend or config.PDF_BACKEND,
+    }
 
     print(f"\n📂 Loading documents from: {data_dir}")
 
@@ -40,78 +265,71 @@ def ingest_command():
         print(f"❌ Data directory not found: {data_dir}")
         return 1
 
-    supported_files = list(data_dir.glob("*.[pP][dD][fF]")) + \
-                     list(data_dir.glob("*.[dD][oO][cC][xX]")) + \
-                     list(data_dir.glob("*.[cC][sS][vV]")) + \
-                     list(data_dir.glob("*.[xX][lL][sS][xX]"))
-
-    if not supported_files:
-        print(f"⚠️  No supported files found in {data_dir}")
-        print(f"   Supported formats: .pdf, .docx, .csv, .xlsx")
-        return 1
-
     try:
         # 1. Load documents
-        loader = DocumentLoader()
-        documents = loader.load_directory(str(data_dir))
+        cache = ExtractionCache(config.EXTRACTION_CACHE_DIR) if config.USE_EXTRACTION_CACHE else None
+        loader = DocumentLoader(
+            workers=workers,
+            cache=cache,
+            options=extract_options,
+            timeout=config.EXTRACT_TIMEOUT,
+            max_rss_mb=config.EXTRACT_MAX_RSS_MB,
+            strip_boilerplate=config.STRIP_BOILERPLATE,
+            include=include if include is not None else config.SCAN_INCLUDE,
+            exclude=exclude if exclude is not None else config.SCAN_EXCLUDE,
+            max_depth=max_depth if max_depth is not None else config.SCAN_MAX_DEPTH,
+        )
+        if append:
+            return append_ingest(loader, data_dir)
+
+        scanned = loader.scan(data_dir)
+        if not scanned:
+            print(f"⚠️  No files found in {data_dir}")
+            return 1
+        print(f"✓ Found {len(scanned)} file(s)")
+
+        documents = loader.load_directory(str(data_dir), scanned=scanned)
+        report = loader.last_report
+
+        for entry in report["quarantined"]:
+            print(f"⚠️  Quarantined {entry['file']}: {entry['reason']}")
+        for entry in report["failed"]:
+            print(f"⚠️  Failed {entry['file']}: {entry['reason']}")
 
         if not documents:
             print("❌ Failed to load documents")
             return 1
 
         print(f"✓ Loaded {len(documents)} document(s)")
+        if report["backends"]:
+            print("✓ PDF pages by backend: "
+                  + ", ".join(f"{name} {count}" for name, count in sorted(report["backends"].items())))
+
+        # Persist extraction output so `rechunk` can skip parsing/OCR
+        store = ExtractionStore(config.EXTRACTION_STORE_PATH)
+        if config.USE_EXTRACTION_STORE and store.available():
+            store.write(documents)
+            print(f"✓ Saved extraction store to {store.path}")
 
         # 2. Chunk documents
         print("🔪 Chunking documents...")
-        chunker = ChunkingEngine(
-            min_chunk_size=config.MIN_CHUNK_SIZE,
-            max_chunk_size=config.MAX_CHUNK_SIZE,
-            overlap_ratio=config.CHUNK_OVERLAP,
-        )
+        chunker = _make_chunker()
         chunks = chunker.chunk_documents(documents)
 
         if not chunks:
             print("❌ No chunks created")
             return 1
 
-        print(f"✓ Created {len(chunks)} chunks")
-
-        # 3. Generate embeddings
-        print("🧠 Generating embeddings...")
-        embedder = EmbeddingEngine(
-            model_name=config.EMBEDDING_MODEL,
-            batch_size=config.BATCH_SIZE,
-            device=config.DEVICE,
-        )
-        chunks = embedder.embed_chunks(chunks)
-        print(f"✓ Generated embeddings ({config.EMBEDDING_DIMENSION} dimensions)")
-
-        # 4. Store in FAISS
-        print("💾 Storing in FAISS...")
-        vector_store = VectorStoreManager(
-            embedding_dim=config.EMBEDDING_DIMENSION,
-            index_type=config.FAISS_INDEX_TYPE,
-            index_path=config.FAISS_INDEX_PATH,
-            metadata_path=config.METADATA_PATH,
-        )
+        print(f"✓ Created {_describe_units(chunks)}")
+        if report["boilerplate_chars"]:
+            print(f"✂️  Stripped {report['boilerplate_chars']:,} chars of repeated headers/footers "
+                  f"(~{chunker.estimate_chunk_count(report['boilerplate_chars'])} chunks saved)")
 
-        embeddings = np.array([c["embedding"] for c in chunks], dtype=np.float32)
-        metadata_list = [
-            {
-                "chunk_id": c["chunk_id"],
-                "doc_id": c["doc_id"],
-                "text": c["text"],
-                "chunk_index": c["chunk_index"],
-                "token_count": c["token_count"],
-            }
-            for c in chunks
-        ]
-
-        vector_store.add_embeddings(embeddings, metadata_list)
-        vector_store.save()
-
-        print(f"✓ Saved FAISS index to {config.VECTOR_STORE_DIR}")
-        print(f"\n✅ Ingest complete: {len(documents)} document(s), {len(chunks)} chunk(s)")
+        # 3-4. Embed and store in FAISS
+        _embed_and_store(_deduplicate(_filter_noise(chunks)), embedder=chunker.sentence_embedder)
+        _record_append_state(AppendState(config.APPEND_STATE_PATH), loader,
+                             data_dir, scanned, documents, chunks)
+        print(f"\n✅ Ingest complete: {len(documents)} document(s), {_count_chunks(chunks)} chunk(s)")
         return 0
 
     except Exception as e:
@@ -120,6 +338,43 @@ def ingest_command():
         return 1
 
 
+def rechunk_command(dry_run: bool = False):
+    """Re-chunk documents from the extraction store and rebuild the index."""
+    store = ExtractionStore(config.EXTRACTION_STORE_PATH)
+    if not store.available():
+        print("❌ pyarrow is not installed: pip install pyarrow")
+        return 1
+    if not store.exists():
+        print(f"❌ Extraction store not found at: {store.path}")
+        print("   Run 'python main.py ingest' first")
+        return 1
+
+    try:
+        print(f"\n📦 Reading extraction store: {store.path}")
+        print(f"🔪 Chunking (min={config.MIN_CHUNK_SIZE}, max={config.MAX_CHUNK_SIZE} tokens, "
+              f"overlap={config.CHUNK_OVERLAP:.0%})...")
+        chunker = _make_chunker()
+        chunks = chunker.chunk_store(store)
+        if not chunks:
+            print("❌ No chunks created")
+            return 1
+
+        tokens = [c["token_count"] for c in chunks if c.get("level", "chunk") == "chunk"]
+        print(f"✓ Created {_describe_units(chunks)} "
+              f"(avg {sum(tokens) / len(tokens):.0f} tokens, max {max(tokens)})")
+        if dry_run:
+            return 0
+
+        _embed_and_store(_deduplicate(_filter_noise(chunks)), embedder=chunker.sentence_embedder)
+        print(f"\n✅ Rechunk complete: {_count_chunks(chunks)} chunk(s)")
+        return 0
+
+    except Exception as e:
+        print(f"❌ Error during rechunk: {str(e)}")
+        logger.exception("Rechunk error")
+        return 1
+
+
 def retrieve_command(query: str, top_k: int = None):
     """Retrieve relevant chunks for a query."""
     top_k = top_k or config.TOP_K
@@ -156,6 +411,7 @@ def retrieve_command(query: str, top_k: int = None):
         builder = ContextBuilder(
             redundancy_threshold=config.REDUNDANCY_THRESHOLD,
             max_context_tokens=config.MAX_CONTEXT_TOKENS,
+            token_counter=_make_token_counter(),
         )
 
         # 3. Retrieve chunks
@@ -203,6 +459,8 @@ def retrieve_command(query: str, top_k: int = None):
         for i, chunk in enumerate(retrieved_chunks[:top_k], 1):
             print(f"\n{i}. {chunk['chunk_id']}")
             print(f"   📍 Document: {chunk['doc_id']}")
+            if chunk.get("section") or chunk.get("page"):
+                print(f"   📄 Section: {chunk.get('section')} | Page: {chunk.get('page')}")
             print(f"   🎯 Semantic similarity: {chunk['similarity_score']:.4f}")
             print(f"   🔑 Keyword overlap: {chunk['keyword_score']:.4f}")
             print(f"   ⭐ Combined score: {chunk['combined_score']:.4f}")
@@ -227,6 +485,19 @@ Examples:
   1. Ingest documents from data/ folder:
      python main.py ingest
 
+     Extract with 8 parallel worker processes:
+     python main.py ingest --workers 8
+
+     Only PDFs, skipping an archive folder, at most two levels deep:
+     python main.py ingest --include '*.pdf' --exclude 'old/*' --max-depth 2
+
+     Add only appended CSV/log lines and new files to the index:
+     python main.py ingest --append
+
+     Re-chunk from the stored extraction after changing chunk sizes:
+     python main.py rechunk
+     python main.py rechunk --dry-run   # only report chunk counts
+
   2. Retrieve relevant chunks:
      python main.py retrieve "What is the main topic?"
 
@@ -241,6 +512,50 @@ Examples:
         "ingest",
         help="Load documents from data/ and build FAISS index"
     )
+    ingest_parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.INGEST_WORKERS,
+        help=f"Extraction processes to run in parallel (default: {config.INGEST_WORKERS})"
+    )
+    ingest_parser.add_argument(
+        "--pdf-backend",
+        choices=["auto", "pymupdf", "pypdf2"],
+        default=config.PDF_BACKEND,
+        help=f"PDF parser to use (default: {config.PDF_BACKEND})"
+    )
+    ingest_parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="Only ingest files matching this pattern (repeatable, e.g. '*.pdf' or 'contracts/*')"
+    )
+    ingest_parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="Skip files/directories matching this pattern (repeatable)"
+    )
+    ingest_parser.add_argument(
+        "--max-depth",
+        type=int,
+        help="Subdirectory levels to descend into data/ (default: unlimited)"
+    )
+    ingest_parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Only index what was appended to CSV/text/log files (and new files) since the last ingest"
+    )
+
+    rechunk_parser = subparsers.add_parser(
+        "rechunk",
+        help="Re-chunk stored extraction output and rebuild FAISS index"
+    )
+    rechunk_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report chunk counts/sizes without embedding or saving"
+    )
 
     retrieve_parser = subparsers.add_parser(
         "retrieve",
@@ -265,7 +580,11 @@ Examples:
         return 1
 
     if args.command == "ingest":
-        return ingest_command()
+        return ingest_command(workers=args.workers, pdf_backend=args.pdf_backend,
+                              append=args.append, include=args.include,
+                              exclude=args.exclude, max_depth=args.max_depth)
+    elif args.command == "rechunk":
+        return rechunk_command(dry_run=args.dry_run)
     elif args.command == "retrieve":
         return retrieve_command(args.query, top_k=args.top_k)
 
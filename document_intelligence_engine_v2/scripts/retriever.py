@@ -4,15 +4,29 @@ Combines semantic similarity with keyword overlap for ranking.
 """
 
 import logging
-from typing import List, Dict, Tuple
+import re
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Questions about a document as a whole, answered from section outlines
+_BROAD_QUERY = re.compile(
+    r"\b(summar\w*|overview|outline|gist|main (points|topics|ideas)|key (points|topics)"
+    r"|what (is|are) (in|this|these)\b.*\b(documents?|files?|reports?)"
+    r"|what (is|are) (this|these|it|they) about)\b",
+    re.IGNORECASE,
+)
+SENTENCE_FANOUT = 4  # sentence hits fetched per requested result before grouping by parent
+
 
 class Retriever:
     """
     Performs hybrid retrieval combining semantic similarity and keyword overlap.
+    
+    When the store holds several unit levels (see ChunkingEngine levels),
+    broad questions search section outlines, and other questions search
+    sentences and return each hit's parent chunk.
     """
     
     def __init__(self, vector_store_manager, embedding_engine,
@@ -34,13 +48,15 @@ class Retriever:
         self.similarity_threshold = similarity_threshold
         self.keyword_boost = keyword_boost
     
-    def retrieve(self, query: str, top_k: int = None) -> List[Dict]:
+    def retrieve(self, query: str, top_k: int = None,
+                 level: Optional[str] = None) -> List[Dict]:
         """
         Retrieve relevant chunks for a query.
         
         Args:
             query: Query string
             top_k: Number of results (uses default if None)
+            level: Unit level to search; chosen per query if None
             
         Returns:
             List of retrieved chunks sorted by relevance score
@@ -55,9 +71,15 @@ class Retriever:
         query_embedding = self.embedding_engine.get_query_embedding(query)
         
         # Get initial results from vector store
+        level = level or self.choose_level(query)
+        fetch = top_k * SENTENCE_FANOUT if level == "sentence" else top_k
         similarities, indices, metadata_list = self.vector_store.search(
-            query_embedding, top_k=top_k
+            query_embedding, top_k=fetch, level=level
         )
+        if level == "sentence":
+            similarities, indices, metadata_list = self._walk_up(
+                similarities, indices, metadata_list, top_k
+            )
         
         # Calculate keyword overlap scores
         query_words = set(self._tokenize_query(query))
@@ -76,10 +98,10 @@ class Retriever:
             
             keyword_scores.append(keyword_score)
         
-        # Combine scores
+        # Combine scores (low-information chunks carry a weight below 1)
         combined_scores = self._combine_scores(
             similarities, keyword_scores
-        )
+        ) * np.array([metadata.get("weight", 1.0) for metadata in metadata_list])
         
         # Build results
         results = []
@@ -92,6 +114,12 @@ class Retriever:
                 "keyword_score": float(keyword_scores[i]),
                 "combined_score": float(combined_scores[i]),
                 "chunk_index": metadata.get("chunk_index"),
+                "page": metadata.get("page"),
+                "page_end": metadata.get("page_end"),
+                "section": metadata.get("section"),
+                "level": metadata.get("level", "chunk"),
+                "parent_id": metadata.get("parent_id"),
+                "duplicates": metadata.get("duplicates", []),
             }
             results.append(result)
         
@@ -104,6 +132,42 @@ class Retriever:
         logger.info(f"Retrieved {len(results)} chunks for query")
         return results
     
+    def choose_level(self, query: str) -> Optional[str]:
+        """
+        Level to search for a query: "section" for broad questions about a
+        whole document, else "sentence" (walked up to chunks), else
+        "chunk". None when the store holds a single level.
+        """
+        levels = self.vector_store.levels()
+        if len(levels) <= 1:
+            return None
+        if "section" in levels and _BROAD_QUERY.search(query):
+            return "section"
+        if "sentence" in levels:
+            return "sentence"
+        return "chunk"
+    
+    def _walk_up(self, similarities: np.ndarray, indices: List[int],
+                 metadata_list: List[Dict], top_k: int) -> Tuple:
+        """
+        Replace sentence hits by their parent chunks, keeping each parent
+        once with its best sentence's similarity. A sentence whose parent
+        is not stored is kept as it is.
+        """
+        walked = {}
+        for similarity, idx, metadata in zip(similarities, indices, metadata_list):
+            parent = self.vector_store.get_metadata(metadata.get("parent_id"))
+            if parent is None:
+                parent = metadata
+            key = parent.get("chunk_id") or idx
+            if key not in walked:
+                walked[key] = (similarity, idx, parent)
+                if len(walked) == top_k:
+                    break
+        hits = list(walked.values())
+        return (np.array([hit[0] for hit in hits], dtype=np.float32),
+                [hit[1] for hit in hits], [hit[2] for hit in hits])
+    
     def _combine_scores(self, similarity_scores: np.ndarray, 
                        keyword_scores: List[float]) -> np.ndarray:
         """
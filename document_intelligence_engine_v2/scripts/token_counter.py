@@ -0,0 +1,121 @@
+"""
+Exact token counting with the embedding model's fast tokenizer.
+Lets the chunker and context builder size text in real word-pieces
+instead of the CHAR_PER_TOKEN estimate, so chunks fill the embedding
+model's input window without being truncated by it.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_SIZE = 200_000  # cached text -> token count entries (cleared when full)
+
+
+def load_token_counter(model_name: str, model_max_tokens: int) -> Optional["TokenCounter"]:
+    """
+    TokenCounter for a model, or None (with a warning) when its tokenizer
+    cannot be loaded, so callers fall back to character-based sizing.
+    """
+    try:
+        return TokenCounter.from_pretrained(model_name, model_max_tokens)
+    except Exception as e:
+        logger.warning(f"Tokenizer sizing unavailable, using character estimates: {e}")
+        return None
+
+
+class TokenCounter:
+    """
+    Batch token counter with a count cache, wrapping a `tokenizers.Tokenizer`.
+    Counts exclude special tokens; `max_tokens` is the window left for text
+    once they are added.
+    """
+
+    def __init__(self, tokenizer, model_max_tokens: int, cache_size: int = CACHE_SIZE):
+        """
+        Args:
+            tokenizer: tokenizers.Tokenizer (Rust fast tokenizer)
+            model_max_tokens: Model input limit, special tokens included
+            cache_size: Maximum cached counts
+        """
+        self.tokenizer = tokenizer
+        # Count whole texts: truncation would cap counts at the window
+        self.tokenizer.no_truncation()
+        self.tokenizer.no_padding()
+        special_tokens = len(self.tokenizer.encode("", add_special_tokens=True).ids)
+        self.max_tokens = model_max_tokens - special_tokens
+        self.cache_size = cache_size
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_pretrained(cls, model_name: str, model_max_tokens: int) -> "TokenCounter":
+        """
+        Load the tokenizer of a sentence-transformers model.
+
+        Args:
+            model_name: Model name, e.g. "all-MiniLM-L6-v2" (resolved under
+                        sentence-transformers/ like SentenceTransformer does)
+            model_max_tokens: Model input limit, special tokens included
+        """
+        try:
+            from tokenizers import Tokenizer
+        except ImportError:
+            raise ImportError(
+                "tokenizers not installed. Install with: pip install tokenizers"
+            )
+        repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        logger.info(f"Loading tokenizer: {repo_id} ({model_max_tokens} token window)")
+        return cls(Tokenizer.from_pretrained(repo_id), model_max_tokens)
+
+    def count(self, text: str) -> int:
+        """Token count of one text."""
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """
+        Token counts of several texts; uncached texts are encoded in one
+        batch call (parallelised inside the Rust tokenizer).
+        """
+        misses = [text for text in dict.fromkeys(texts) if text not in self._cache]
+        self.hits += len(texts) - len(misses)
+        self.misses += len(misses)
+        if misses:
+            encodings = self.tokenizer.encode_batch(misses, add_special_tokens=False)
+            if len(self._cache) + len(misses) > self.cache_size:
+                self._cache.clear()
+            for text, encoding in zip(misses, encodings):
+                self._cache[text] = len(encoding.ids)
+        return [self._cache[text] for text in texts]
+
+    def split(self, text: str, max_tokens: int) -> List[Tuple[int, int]]:
+        """
+        Cut a text longer than max_tokens into (start, end) character spans
+        of at most max_tokens tokens each.
+
+        Cuts fall on the last whitespace before the token limit; a single
+        word longer than the limit is cut between its word-pieces.
+        """
+        spans = []
+        start = 0
+        while start < len(text):
+            rest = text[start:]
+            if self.count(rest) <= max_tokens:
+                spans.append((start, len(text)))
+                break
+            offsets = self.tokenizer.encode(rest, add_special_tokens=False).offsets
+            limit = offsets[max_tokens - 1][1]
+            cut = rest.rfind(" ", 0, limit + 1)
+            if cut <= 0:
+                cut = limit
+            spans.append((start, start + len(rest[:cut].rstrip())))
+            start += cut
+            while start < len(text) and text[start] == " ":
+                start += 1
+        return spans
+
+    def get_stats(self) -> dict:
+        """Get cache hit/miss counters."""
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self._cache)}
@@ -9,23 +9,35 @@ from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 import numpy as np
 
-try:
-    import faiss
-except ImportError:
-    faiss = None
+faiss = None  # imported by _load_faiss on first VectorStoreManager
 
 logger = logging.getLogger(__name__)
 
 
+def _load_faiss():
+    global faiss
+    if faiss is None:
+        try:
+            import faiss as faiss_module
+        except ImportError:
+            raise ImportError(
+                "faiss not installed. Install with: pip install faiss-cpu"
+            )
+        faiss = faiss_module
+    return faiss
+
+
 class VectorStoreManager:
     """
     Manages FAISS vector index for similarity search.
-    Stores embeddings and maintains metadata mapping.
+    Stores embeddings and maintains metadata mapping, keyed by chunk_id so
+    vectors of unchanged chunks can be found and reused.
     """
     
     def __init__(self, embedding_dim: int, index_type: str = "cosine",
                  index_path: Optional[Path] = None,
-                 metadata_path: Optional[Path] = None):
+                 metadata_path: Optional[Path] = None,
+                 embedding_model: Optional[str] = None):
         """
         Initialize the vector store manager.
         
@@ -34,23 +46,34 @@ class VectorStoreManager:
             index_type: Type of index ("cosine" or "l2")
             index_path: Path to save/load index
             metadata_path: Path to save/load metadata
+            embedding_model: Model the embeddings come from; recorded with
+                             each vector so vectors of another model are
+                             never reused
         """
-        if faiss is None:
-            raise ImportError(
-                "faiss not installed. Install with: pip install faiss-cpu"
-            )
+        _load_faiss()
         
         self.embedding_dim = embedding_dim
         self.index_type = index_type
         self.index_path = Path(index_path) if index_path else None
         self.metadata_path = Path(metadata_path) if metadata_path else None
+        self.embedding_model = embedding_model
         
         # Create index
         self.index = self._create_index()
         self.metadata = {}  # Maps index position to chunk metadata
+        self.positions = {}  # Maps chunk_id to index position
+        self.vector_count = 0
+        self._selectors = None  # level -> (positions, faiss.IDSelector), built on demand
+    
+    def reset(self) -> None:
+        """Empty the index and metadata (nothing is written until save)."""
+        self.index = self._create_index()
+        self.metadata = {}
+        self.positions = {}
         self.vector_count = 0
+        self._selectors = None
     
-    def _create_index(self) -> faiss.Index:
+    def _create_index(self) -> "faiss.Index":
         """Create a new FAISS index."""
         if self.index_type == "cosine":
             # For cosine similarity, normalize embeddings and use L2
@@ -68,6 +91,9 @@ class VectorStoreManager:
         """
         Add embeddings to the index.
         
+        Embeddings whose chunk_id is already stored are skipped, so adding
+        the same chunks twice does not duplicate them.
+        
         Args:
             embeddings: numpy array of shape (n, embedding_dim)
             metadata_list: List of metadata dicts for each embedding
@@ -75,6 +101,22 @@ class VectorStoreManager:
         if len(embeddings) != len(metadata_list):
             raise ValueError("Embeddings and metadata sizes don't match")
         
+        keep = []
+        for i, metadata in enumerate(metadata_list):
+            chunk_id = metadata.get("chunk_id")
+            if chunk_id is not None and chunk_id in self.positions:
+                continue
+            keep.append(i)
+            if chunk_id is not None:
+                # Reserve the position so repeats within this batch are skipped too
+                self.positions[chunk_id] = self.vector_count + len(keep) - 1
+        if len(keep) < len(metadata_list):
+            logger.info(f"Skipped {len(metadata_list) - len(keep)} embeddings already in the store")
+            embeddings = embeddings[keep]
+            metadata_list = [metadata_list[i] for i in keep]
+        if not len(embeddings):
+            return
+        
         # Normalize for cosine similarity if needed
         if self.index_type == "cosine":
             embeddings = self._normalize_embeddings(embeddings)
@@ -87,19 +129,72 @@ class VectorStoreManager:
         
         # Store metadata
         for i, metadata in enumerate(metadata_list):
+            if self.embedding_model is not None:
+                metadata = {**metadata, "embedding_model": self.embedding_model}
             self.metadata[self.vector_count + i] = metadata
         
         self.vector_count += len(embeddings)
+        self._selectors = None
         logger.info(f"Added {len(embeddings)} embeddings. Total: {self.vector_count}")
     
+    def get_embeddings(self, chunk_ids: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Stored vectors for the given chunk IDs.
+        
+        Only vectors recorded with this store's embedding_model are
+        returned; vectors of other models (or unrecorded ones) count as
+        missing.
+        
+        Args:
+            chunk_ids: Chunk IDs to look up
+            
+        Returns:
+            Dict of chunk_id -> embedding (normalized for cosine indexes)
+            for the IDs that were found
+        """
+        found = [
+            (chunk_id, self.positions[chunk_id]) for chunk_id in chunk_ids
+            if chunk_id in self.positions
+            and self.metadata[self.positions[chunk_id]].get("embedding_model") == self.embedding_model
+        ]
+        if not found or self.index.d != self.embedding_dim:
+            return {}
+        positions = np.array([position for _, position in found], dtype=np.int64)
+        vectors = self.index.reconstruct_batch(positions)
+        return {chunk_id: vector for (chunk_id, _), vector in zip(found, vectors)}
+    
+    def get_metadata(self, chunk_id: str) -> Optional[Dict]:
+        """Metadata of a stored chunk (or sentence/section unit), if present."""
+        position = self.positions.get(chunk_id)
+        return self.metadata.get(position) if position is not None else None
+    
+    def levels(self) -> List[str]:
+        """Unit levels present in the store ("chunk" for chunks without one)."""
+        return list(self._level_selectors())
+    
+    def _level_selectors(self) -> Dict:
+        if self._selectors is None:
+            by_level = {}
+            for position, metadata in self.metadata.items():
+                by_level.setdefault(metadata.get("level", "chunk"), []).append(position)
+            self._selectors = {}
+            for level, positions in by_level.items():
+                positions = np.array(positions, dtype=np.int64)
+                # The selector reads the array in place, so it is kept alongside
+                selector = faiss.IDSelectorBatch(positions.size, faiss.swig_ptr(positions))
+                self._selectors[level] = (positions, selector)
+        return self._selectors
+    
     def search(self, query_embedding: np.ndarray, 
-               top_k: int = 5) -> Tuple[np.ndarray, List[int], List[Dict]]:
+               top_k: int = 5, level: Optional[str] = None) -> Tuple[np.ndarray, List[int], List[Dict]]:
         """
         Search for similar embeddings.
         
         Args:
             query_embedding: Query embedding (shape: embedding_dim)
             top_k: Number of results to return
+            level: Only search units of this level ("sentence", "chunk" or
+                   "section"); other vectors are skipped, not scored
             
         Returns:
             Tuple of (distances, indices, metadata_list)
@@ -114,10 +209,19 @@ class VectorStoreManager:
         query_embedding = query_embedding.astype(np.float32).reshape(1, -1)
         
         # Search
-        distances, indices = self.index.search(query_embedding, top_k)
+        if level is None:
+            distances, indices = self.index.search(query_embedding, top_k)
+        else:
+            selector = self._level_selectors().get(level)
+            if selector is None:
+                return np.array([], dtype=np.float32), [], []
+            params = faiss.SearchParameters(sel=selector[1])
+            distances, indices = self.index.search(query_embedding, top_k, params=params)
         
-        distances = distances[0]
-        indices = indices[0].tolist()
+        # Fewer matches than top_k are padded with -1
+        found = indices[0] >= 0
+        distances = distances[0][found]
+        indices = indices[0][found].tolist()
         
         # Convert distances to similarities (for L2 distance)
         if self.index_type == "cosine":
@@ -186,6 +290,11 @@ class VectorStoreManager:
                 self.metadata = {
                     int(key): value for key, value in metadata_serializable.items()
                 }
+                self.positions = {
+                    value["chunk_id"]: key for key, value in self.metadata.items()
+                    if "chunk_id" in value
+                }
+                self._selectors = None
                 logger.info(f"Loaded metadata from {self.metadata_path}")
             else:
                 logger.warning(f"Metadata file not found: {self.metadata_path}")
@@ -0,0 +1,131 @@
+import os
+import time
+
+from append_state import AppendState
+from chunking_engine import ChunkingEngine
+from document_loader import DocumentLoader
+
+
+def _append_cycle(tmp_path, name, first, appended):
+    """Full-ingest `first`, append `appended`, return (full chunks, tail chunks)."""
+    data_file = tmp_path / name
+    data_file.write_text(first, encoding="utf-8")
+    loader = DocumentLoader()
+    chunker = ChunkingEngine(levels=("sentence", "chunk", "section"))
+    doc = loader.load_document(str(data_file), root=str(tmp_path))
+    full_chunks = chunker.chunk_document(doc)
+
+    state = AppendState(tmp_path / "append_state.json")
+    state.record(data_file, doc["metadata"]["ingested_bytes"], doc,
+                 sum(1 for c in full_chunks if c["level"] == "chunk"))
+    with open(data_file, "a", encoding="utf-8") as f:
+        f.write(appended)
+    status, entry = state.check(data_file)
+    assert status == "appended"
+
+    tail = loader.load_tail(data_file, entry)
+    tail_chunks = list(chunker.chunk_stream(tail["pages"], tail["doc_id"],
+                                            start_index=entry["next_chunk"],
+                                            id_scope=f"@{entry['offset']}"))
+    return full_chunks, tail_chunks
+
+
+def test_appended_log_line_repeating_earlier_text_gets_a_new_id(tmp_path):
+    line = "INFO heartbeat from scheduler, all workers reporting healthy.\n"
+    full_chunks, tail_chunks = _append_cycle(tmp_path, "app.log", line, line)
+
+    assert tail_chunks
+    full_ids = {c["chunk_id"] for c in full_chunks}
+    assert not full_ids & {c["chunk_id"] for c in tail_chunks}
+    tail_ids = {c["chunk_id"] for c in tail_chunks}
+    assert all(c["parent_id"] in tail_ids for c in tail_chunks if c["parent_id"])
+
+
+def test_appended_csv_row_repeating_earlier_row_gets_a_new_id(tmp_path):
+    header = "date,region,amount\n"
+    row = "2024-01-01,north,100\n"
+    full_chunks, tail_chunks = _append_cycle(tmp_path, "sales.csv", header + row, row)
+
+    assert tail_chunks
+    assert not {c["chunk_id"] for c in full_chunks} & {c["chunk_id"] for c in tail_chunks}
+
+
+def _full_ingest(loader, data_dir, scanned):
+    """load_directory plus the state main.py records after a full ingest."""
+    documents = loader.load_directory(str(data_dir), scanned=scanned)
+    state = AppendState(data_dir.parent / "append_state.json")
+    for doc in documents:
+        state.record(data_dir / doc["filename"], doc["metadata"]["ingested_bytes"], doc)
+    return documents, state
+
+
+def _text(doc):
+    return "\n".join(page["text"] for page in doc["pages"])
+
+
+def test_line_being_written_is_left_for_the_next_append(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    log = data_dir / "app.log"
+    log.write_text("line one\nline two partia", encoding="utf-8")
+    loader = DocumentLoader()
+
+    [doc], state = _full_ingest(loader, data_dir, loader.scan(data_dir))
+    assert _text(doc) == "line one"
+
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("l finished\n")
+    status, entry = state.check(log)
+    assert status == "appended"
+    assert _text(loader.load_tail(log, entry)) == "line two partial finished"
+
+
+def test_lines_written_after_the_scan_are_ingested_once(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    log = data_dir / "app.log"
+    log.write_text("line one\nline two\n", encoding="utf-8")
+    loader = DocumentLoader()
+    scanned = loader.scan(data_dir)
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("line three\n")
+
+    [doc], state = _full_ingest(loader, data_dir, scanned)
+    assert _text(doc) == "line one\nline two"
+
+    status, entry = state.check(log)
+    assert status == "appended"
+    assert _text(loader.load_tail(log, entry)) == "line three"
+
+
+def test_settled_file_without_final_line_break_is_ingested_whole(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    notes = data_dir / "notes.txt"
+    notes.write_text("first line\nlast line", encoding="utf-8")
+    an_hour_ago = time.time() - 3600
+    os.utime(notes, (an_hour_ago, an_hour_ago))
+    loader = DocumentLoader()
+
+    [doc], _ = _full_ingest(loader, data_dir, loader.scan(data_dir))
+
+    assert _text(doc) == "first line\nlast line"
+    assert doc["metadata"]["ingested_bytes"] == notes.stat().st_size
+
+
+def test_csv_header_with_quoted_line_break_is_kept_for_tails(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    sales = data_dir / "sales.csv"
+    sales.write_text('"first\nname",amount\nalice,10\n', encoding="utf-8")
+    loader = DocumentLoader()
+
+    [doc], state = _full_ingest(loader, data_dir, loader.scan(data_dir))
+    with open(sales, "a", encoding="utf-8") as f:
+        f.write("bob,20\n")
+    status, entry = state.check(sales)
+    tail = loader.load_tail(sales, entry)
+
+    assert entry["header"] == "first\nname | amount"
+    assert [page["text"] for page in tail["pages"]] == ["first\nname | amount\nbob | 20"]
+    assert tail["pages"][0]["rows"] == [3, 3]
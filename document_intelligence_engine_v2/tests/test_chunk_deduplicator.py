@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from chunk_deduplicator import ChunkDeduplicator
+
+TEMPLATE = (
+    "This services agreement is made between {party} and the client named below. "
+    "The supplier shall deliver the services described in the schedule with due care "
+    "and skill, and the client shall pay the fee of {amount} within thirty days of each "
+    "invoice. Either party may terminate this agreement by giving written notice to the "
+    "other party, and the obligations on confidentiality survive its termination."
+)
+
+
+def _chunk(doc_id, index, text):
+    return {"chunk_id": f"{doc_id}#{index}", "doc_id": doc_id, "chunk_index": index,
+            "level": "chunk", "page": 1, "text": text}
+
+
+def test_template_copies_with_other_parties_or_amounts_are_kept():
+    chunks = [
+        _chunk("acme.pdf", 0, TEMPLATE.format(party="Acme Limited", amount="$12,000")),
+        _chunk("globex.pdf", 0, TEMPLATE.format(party="Globex Limited", amount="$12,000")),
+        _chunk("acme-2024.pdf", 0, TEMPLATE.format(party="Acme Limited", amount="$15,500")),
+    ]
+
+    kept = ChunkDeduplicator().deduplicate(chunks)
+
+    assert [c["doc_id"] for c in kept] == ["acme.pdf", "globex.pdf", "acme-2024.pdf"]
+
+
+def test_same_text_in_two_documents_is_folded():
+    text = TEMPLATE.format(party="Acme Limited", amount="$12,000")
+    chunks = [_chunk("contract.pdf", 0, text), _chunk("contract.docx", 0, text)]
+
+    kept = ChunkDeduplicator().deduplicate(chunks)
+
+    assert [c["doc_id"] for c in kept] == ["contract.pdf"]
+    assert [(d["doc_id"], d["similarity"]) for d in kept[0]["duplicates"]] == [("contract.docx", 1.0)]
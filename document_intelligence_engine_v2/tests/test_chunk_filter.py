@@ -0,0 +1,43 @@
+import pytest
+
+from chunk_filter import ChunkFilter
+
+
+@pytest.mark.parametrize("text", [
+    "The rent is $2,500 per month, due on the first day of each month.",
+    "The Purchaser shall pay the Seller upon delivery of the goods.",
+    "买方应在货物交付时向卖方付款。",
+    "Арендная плата вносится ежемесячно.",
+])
+def test_short_real_clauses_are_not_noise(text):
+    assert ChunkFilter.score(text) >= 0.9
+
+
+@pytest.mark.parametrize("text", [
+    "Signature: ____________ Date: __________\nName: John Smith Title: Director",
+    "Page 3 of 12",
+    "- 14 -",
+    "Date: 12 March 2024",
+])
+def test_form_fields_and_page_numbers_are_noise(text):
+    assert ChunkFilter.score(text) < 0.4
+
+
+def test_drop_mode_keeps_short_clauses_and_drops_signature_blocks():
+    chunks = [
+        {"chunk_id": "a", "level": "chunk", "text": "The Purchaser shall pay the Seller upon delivery."},
+        {"chunk_id": "b", "level": "chunk", "text": "Signature: __________ Date: __________"},
+        {"chunk_id": "c", "level": "sentence", "parent_id": "b", "text": "Signature: __________"},
+    ]
+    chunk_filter = ChunkFilter(mode="drop")
+
+    kept = chunk_filter.apply(chunks)
+
+    assert [c["chunk_id"] for c in kept] == ["a"]
+    assert chunk_filter.last_stats == {"chunks": 3, "noise": 1}
+
+
+def test_default_mode_downweights_instead_of_dropping():
+    kept = ChunkFilter().apply([{"chunk_id": "b", "level": "chunk", "text": "Page 3 of 12"}])
+
+    assert kept[0]["weight"] == 0.5
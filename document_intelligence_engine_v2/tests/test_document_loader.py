@@ -0,0 +1,170 @@
+import codecs
+import zipfile
+
+import pytest
+
+from document_loader import DocumentLoader
+
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _write_docx(path, paragraphs):
+    """Minimal .docx: (style id or None, text) paragraphs, Heading1 defined in styles.xml."""
+    body = "".join(
+        "<w:p>"
+        + (f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else "")
+        + f"<w:r><w:t>{text}</w:t></w:r></w:p>"
+        for style, text in paragraphs
+    )
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("[Content_Types].xml", "<Types/>")
+        zf.writestr("word/styles.xml",
+                    f'<w:styles xmlns:w="{_W_NS}"><w:style w:styleId="Heading1">'
+                    f'<w:name w:val="heading 1"/></w:style></w:styles>')
+        zf.writestr("word/document.xml",
+                    f'<w:document xmlns:w="{_W_NS}"><w:body>{body}</w:body></w:document>')
+
+
+def test_log_edge_lines_are_not_stripped_as_boilerplate(tmp_path):
+    lines = []
+    for block in range(6):
+        lines.append(f"2024-01-01 12:00:0{block} INFO heartbeat")
+        lines += [f"2024-01-01 12:{block:02d}:30 WARN disk {block} at {70 + block}%"] * 3
+        lines.append(f"2024-01-01 12:59:0{block} INFO heartbeat")
+        lines.append("")
+    path = tmp_path / "service.log"
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+    loader = DocumentLoader(options={"text_stream_threshold": 100, "text_block_bytes": 200})
+    doc = loader.load_document(str(path))
+
+    assert len(doc["pages"]) > 3
+    assert doc["metadata"]["boilerplate_chars"] == 0
+    text = "\n".join(record["text"] for record in doc["pages"])
+    assert text.count("INFO heartbeat") == 12
+
+
+def test_docx_edge_paragraphs_are_not_stripped_as_boilerplate(tmp_path):
+    paragraphs = []
+    for section in range(1, 5):
+        paragraphs += [
+            ("Heading1", f"Clause {section}"),
+            (None, f"Status: reviewed 2024-01-0{section}"),
+            (None, f"The supplier delivers batch {section} within {section * 10} days."),
+            (None, f"Status: reviewed 2024-02-0{section}"),
+        ]
+    path = tmp_path / "contract.docx"
+    _write_docx(path, paragraphs)
+
+    doc = DocumentLoader().load_document(str(path))
+
+    assert doc["metadata"]["boilerplate_chars"] == 0
+    assert [record["section"] for record in doc["pages"]] == [f"Clause {i}" for i in range(1, 5)]
+    text = "\n".join(record["text"] for record in doc["pages"])
+    assert text.count("Status: reviewed") == 8
+
+
+@pytest.mark.parametrize("encoding", ["utf-16", "utf-16-be", "utf-8-sig"])
+def test_streamed_text_honours_the_bom(tmp_path, encoding):
+    lines = [f"Entry {n}: café résumé naïve" for n in range(40)]
+    path = tmp_path / "notes.txt"
+    data = ("\n".join(lines) + "\n").encode(encoding)
+    if encoding == "utf-16-be":
+        data = codecs.BOM_UTF16_BE + data
+    path.write_bytes(data)
+
+    doc = DocumentLoader(options={"text_stream_threshold": 100, "text_block_bytes": 300}) \
+        .load_document(str(path))
+
+    assert len(doc["pages"]) > 1
+    text = "\n".join(page["text"] for page in doc["pages"])
+    assert "\ufeff" not in text
+    assert [line.strip() for line in text.splitlines() if line.strip()] == lines
+
+
+def test_cache_hit_on_a_copy_reports_the_copy_as_source(tmp_path):
+    from extraction_cache import ExtractionCache
+
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "original.txt").write_text("Quarterly revenue grew in every region.\n", encoding="utf-8")
+    loader = DocumentLoader(cache=ExtractionCache(tmp_path / "cache"))
+    loader.load_document(str(data / "original.txt"))
+
+    (data / "copy.txt").write_text("Quarterly revenue grew in every region.\n", encoding="utf-8")
+    doc = loader.load_document(str(data / "copy.txt"))
+
+    assert loader.cache.hits == 1
+    assert doc["filename"] == "copy.txt"
+    assert [page["source"] for page in doc["pages"]] == ["copy.txt"]
+
+
+def test_empty_html_heading_starts_a_fresh_section(tmp_path):
+    pytest.importorskip("lxml")
+    path = tmp_path / "page.html"
+    path.write_text(
+        "<html><body><h2>Pricing</h2><p>Plans start at ten dollars.</p>"
+        "<h2> </h2><p>Contact sales for volume discounts.</p></body></html>",
+        encoding="utf-8",
+    )
+
+    doc = DocumentLoader(options={"html_parser": "lxml"}).load_document(str(path))
+
+    assert [(page["section"], page["text"]) for page in doc["pages"]] == [
+        ("Pricing", "Pricing\nPlans start at ten dollars."),
+        (None, "Contact sales for volume discounts."),
+    ]
+
+
+def test_count_archive_members_reads_only_the_first_tar_header(tmp_path):
+    import io
+    import tarfile
+
+    from document_loader import count_archive_members
+
+    good = tmp_path / "docs.tar.gz"
+    with tarfile.open(good, "w:gz") as tf:
+        for n in range(3):
+            data = f"member {n}".encode()
+            info = tarfile.TarInfo(f"doc{n}.txt")
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    bad = tmp_path / "broken.tar"
+    bad.write_bytes(b"not a tar archive" * 64)
+    archive = tmp_path / "docs.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.txt", "a")
+        zf.writestr("b.txt", "b")
+
+    assert count_archive_members(good) is None
+    assert count_archive_members(archive) == 2
+    with pytest.raises(tarfile.TarError):
+        count_archive_members(bad)
+
+
+def test_body_lines_differing_only_in_numbers_are_not_boilerplate():
+    from document_loader import _strip_boilerplate
+
+    records = [
+        {"source": "contract.pdf", "page": i, "section": None,
+         "text": f"ACME Corp - Confidential\n"
+                 f"The buyer pays item {i} at price {i * 3} dollars on delivery.\n"
+                 f"Page {i} of 40"}
+        for i in range(1, 41)
+    ]
+
+    kept, removed = _strip_boilerplate(records)
+
+    assert [r["text"] for r in kept] == [
+        f"The buyer pays item {i} at price {i * 3} dollars on delivery." for i in range(1, 41)
+    ]
+    assert removed > 0
+
+
+def test_short_slides_keep_their_numbered_bullets():
+    from document_loader import _strip_boilerplate
+
+    records = [{"source": "deck.pptx", "page": i, "section": None, "text": f"Step {i}: review the figures"}
+               for i in range(1, 11)]
+
+    assert _strip_boilerplate(records) == (records, 0)
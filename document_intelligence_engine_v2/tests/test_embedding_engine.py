@@ -0,0 +1,33 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from chunking_engine import ChunkingEngine
+from embedding_engine import EmbeddingEngine
+
+
+class _CountingModel:
+    """Stands in for a SentenceTransformer, recording what it is asked to encode."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_one_chunk_section_is_embedded_once():
+    engine = EmbeddingEngine.__new__(EmbeddingEngine)
+    engine.model, engine.batch_size = _CountingModel(), 32
+    chunker = ChunkingEngine(levels=("chunk", "section"))
+    units = chunker.chunk_document({
+        "doc_id": "notes.txt",
+        "pages": [{"page": 1, "section": "Scope", "text": "Only one short paragraph here."}],
+    })
+    assert [u["level"] for u in units] == ["chunk", "section"]
+
+    engine.embed_chunks(units)
+
+    assert len(engine.model.encoded) == 1
+    assert np.array_equal(units[0]["embedding"], units[1]["embedding"])
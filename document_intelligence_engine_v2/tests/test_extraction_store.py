@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from extraction_store import ExtractionStore
+
+
+def test_page_backend_survives_the_store(tmp_path):
+    store = ExtractionStore(tmp_path / "extractions.parquet")
+    store.write([{
+        "doc_id": "scan.pdf",
+        "filename": "scan.pdf",
+        "pages": [
+            {"source": "scan.pdf", "page": 1, "section": None, "text": "Typed page", "backend": "pymupdf"},
+            {"source": "scan.pdf", "page": 2, "section": None, "text": "Scanned page", "backend": "ocr"},
+        ],
+        "metadata": {"format": "pdf"},
+    }])
+
+    [doc] = store.load_documents()
+
+    assert [page["backend"] for page in doc["pages"]] == ["pymupdf", "ocr"]
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HEAVY_MODULES = ("torch", "faiss", "sentence_transformers", "pyarrow")
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+# Cold start measures ~0.4 s for the CLI and ~0.2 s for the loader/chunker;
+# the budgets leave room for slow CI machines but catch a heavy import
+# creeping back in (torch alone takes seconds).
+CLI_STARTUP_BUDGET = 1.5
+LOADER_IMPORT_BUDGET = 1.0
+
+
+def _best_time(args, runs=3):
+    """Fastest of `runs` wall-clock timings of `python *args` run from scripts/."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=SCRIPTS_DIR,
+                       capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_importing_the_package_does_not_load_heavy_dependencies():
+    check = (
+        "import sys, scripts; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", check],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_cli_help_starts_within_budget():
+    assert _best_time(["main.py", "--help"]) < CLI_STARTUP_BUDGET
+
+
+def test_loader_and_chunker_import_within_budget():
+    assert _best_time(["-c", "import document_loader, chunking_engine"]) < LOADER_IMPORT_BUDGET
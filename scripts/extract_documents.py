@@ -66,8 +66,24 @@ def extract_tables_from_docx(doc):
 # -------------------------------
 # EXTRACTION FUNCTIONS
 # -------------------------------
+def ocr_pages(file_path, page_nums):
+    """Rasterize only the given pages (one call per run of consecutive pages) and OCR them."""
+    ocr_text = {}
+    runs = []
+    for page_num in sorted(page_nums):
+        if runs and page_num == runs[-1][1] + 1:
+            runs[-1][1] = page_num
+        else:
+            runs.append([page_num, page_num])
+    for first, last in runs:
+        images = convert_from_path(file_path, first_page=first, last_page=last)
+        for page_num, image in zip(range(first, last + 1), images):
+            ocr_text[page_num] = pytesseract.image_to_string(image)
+    return ocr_text
+
 def extract_pdf(file_path):
-    text_chunks = []
+    page_chunks = {}  # page number -> chunks, so OCR'd pages land back in page order
+    image_only_pages = []
     try:
         with open(file_path, 'rb') as f:
             reader = PyPDF2.PdfReader(f)
@@ -80,20 +96,21 @@ def extract_pdf(file_path):
                         heading = detect_heading_pdf(line)
                         if heading:
                             section = heading
+                    chunks = page_chunks[page_num] = []
                     # detect tables (simple heuristic: multiple | or tab spacing)
                     table_lines = [l for l in text.split("\n") if re.search(r"\s{2,}|\|", l)]
                     for t_line in table_lines:
-                        text_chunks.extend(chunk_text(t_line, file_path.name, page_num, section))
-                    text_chunks.extend(chunk_text(text, file_path.name, page_num, section))
+                        chunks.extend(chunk_text(t_line, file_path.name, page_num, section))
+                    chunks.extend(chunk_text(text, file_path.name, page_num, section))
                 else:
-                    # OCR fallback
-                    images = convert_from_path(file_path)
-                    for i, image in enumerate(images):
-                        ocr_text = pytesseract.image_to_string(image)
-                        text_chunks.extend(chunk_text(ocr_text, file_path.name, i+1))
+                    image_only_pages.append(page_num)
+        # OCR fallback: rasterize only the pages without a text layer
+        if image_only_pages:
+            for page_num, ocr_text in ocr_pages(file_path, image_only_pages).items():
+                page_chunks[page_num] = chunk_text(ocr_text, file_path.name, page_num)
     except Exception as e:
         print(f"[ERROR] PDF extraction failed for {file_path}: {e}")
-    return text_chunks
+    return [chunk for page_num in sorted(page_chunks) for chunk in page_chunks[page_num]]
 
 def extract_docx(file_path):
     text_chunks = []